@@ -1,6 +1,25 @@
 import pandas as pd
-from bs4 import BeautifulSoup
-import requests
+from io import StringIO
+import time
+from cache import TTLCache, DiskCache
+from http_client import http
+from settings import settings
+
+
+def get_page_ttl():
+    cache_config = settings.screener_cache()
+    return max(cache_config['tables_ttl'], cache_config['key_stats_ttl'])
+
+
+cache_config = settings.screener_cache()
+# parsed pages live in memory, the raw html survives restarts on disk
+page_memory = TTLCache(maxsize=cache_config['max_entries'],
+                       ttl=get_page_ttl(), name='screener_pages_memory')
+# the disk tier purges with the configured ttls of the moment
+page_disk = DiskCache('screener_pages', ttl=get_page_ttl)
+# every company of an industry shares the same peers table
+peers_memory = TTLCache(maxsize=cache_config['peers_max_entries'],
+                        ttl=cache_config['peers_ttl'], name='screener_peers')
 
 
 class STicker:
@@ -9,56 +28,76 @@ class STicker:
         self.symbol = symbol
         self.core_url = 'https://www.screener.in'
         self.link = f"{self.core_url}/company/{self.symbol}/consolidated/"
-        page = requests.get(self.link)
-        self.__soup = BeautifulSoup(page.content, 'html.parser')
-        self.__tables = pd.read_html(self.link)
+        cache_config = settings.screener_cache()
+        # fresh enough for both getters, so a refresh happens here inside
+        # the caller's deadline and not again from a later getter
+        self.__page = load_company_page(self.link, min(
+            cache_config['tables_ttl'], cache_config['key_stats_ttl']))
+
+    def __get_page(self, max_age):
+        if time.time() - self.__page['fetched_at'] > max_age:
+            self.__page = load_company_page(self.link, max_age)
+        return self.__page
+
+    def __get_soup(self):
+        return self.__get_page(
+            settings.screener_cache()['key_stats_ttl'])['soup']
+
+    def __get_tables(self):
+        return self.__get_page(
+            settings.screener_cache()['tables_ttl'])['tables']
 
     def get_screener_link(self):
         return self.link
 
     def get_company_description(self):
-        return self.__soup.find_all('p')[0].string.strip()
+        return self.__get_soup().find_all('p')[0].string.strip()
 
     def get_company_name(self):
-        return self.__soup.find_all('h1')[0].string.strip()
+        return self.__get_soup().find_all('h1')[0].string.strip()
 
     def get_company_link(self):
-        return self.__soup.find('div', attrs={
+        return self.__get_soup().find('div', attrs={
             "class": "company-links show-from-tablet-landscape"})\
             .find_all('a')[0].get('href')
 
     def get_bse_link(self):
-        return self.__soup.find('div', attrs={
+        return self.__get_soup().find('div', attrs={
             "class": "company-links show-from-tablet-landscape"})\
             .find_all('a')[1].get('href')
 
     def get_nse_link(self):
-        return self.__soup.find('div', attrs={
+        return self.__get_soup().find('div', attrs={
             "class": "company-links show-from-tablet-landscape"})\
             .find_all('a')[2].get('href')
 
     def get_industry_peer_comparison(self) -> pd.DataFrame:
         comparison_link = self.core_url + \
-            self.__soup.find('section', id='peers').find_next(
+            self.__get_soup().find('section', id='peers').find_next(
                 'a').find_next('a').get('href')
-        peer_comparison = pd.read_html(comparison_link)
-        peer_comparison = peer_comparison[0]
-        peer_comparison.drop('S.No.', axis=1, inplace=True)
-        if 15 in peer_comparison.index:
-            peer_comparison.drop(index=15, inplace=True)
-            peer_comparison.reset_index(drop=True, inplace=True)
-        return peer_comparison
+        peer_comparison = peers_memory.get(
+            comparison_link, settings.screener_cache()['peers_ttl'])
+        if peer_comparison is None:
+            peer_comparison = pd.read_html(
+                StringIO(http.get(comparison_link).text))
+            peer_comparison = peer_comparison[0]
+            peer_comparison.drop('S.No.', axis=1, inplace=True)
+            if 15 in peer_comparison.index:
+                peer_comparison.drop(index=15, inplace=True)
+                peer_comparison.reset_index(drop=True, inplace=True)
+            peers_memory.set(comparison_link, peer_comparison)
+        return peer_comparison.copy()
 
     def get_industry(self) -> str:
-        return self.__soup.find('section', id='peers').find_next('a').\
+        return self.__get_soup().find('section', id='peers').find_next('a').\
             find_next('a').string.strip()
 
     def get_sector(self) -> str:
-        return self.__soup.find('section', id='peers').\
+        return self.__get_soup().find('section', id='peers').\
             find_next('a').string.strip()
 
     def get_key_stats(self) -> dict:
-        section = self.__soup.find('div', class_='company-ratios')
+        section = self.__get_soup().find('div', class_='company-ratios')
         company_ratios = section.find_next('ul').find_all('li')
         return {ratio.find('span', class_='name').string.strip():
                 '/'.join([a.string for a in ratio.find_all(
@@ -68,7 +107,7 @@ class STicker:
     def get_pros_and_cons(self) -> dict:
 
         def get_list(class_) -> list:
-            section = self.__soup.find('div', class_=class_)
+            section = self.__get_soup().find('div', class_=class_)
             list = section.find_next('ul').find_all('li')
             try:
                 return [l.string.strip() for l in list]
@@ -80,47 +119,48 @@ class STicker:
         return {'pros': pros, 'cons': cons}
 
     def get_quarterly_results(self) -> pd.DataFrame:
-        table = self.__tables[0]
+        table = self.__get_tables()[0]
         return self.read_and_format_table(table[:-1])
 
     def get_profit_and_loss(self) -> pd.DataFrame:
-        table = self.__tables[1]
+        table = self.__get_tables()[1]
         return self.read_and_format_table(table)
 
     def get_balance_sheet(self) -> pd.DataFrame:
-        table = self.__tables[6]
+        table = self.__get_tables()[6]
         return self.read_and_format_table(table)
 
     def get_cash_flow(self) -> pd.DataFrame:
-        table = self.__tables[7]
+        table = self.__get_tables()[7]
         return self.read_and_format_table(table)
 
     def get_ratios(self) -> pd.DataFrame:
-        table = self.__tables[8]
+        table = self.__get_tables()[8]
         return self.read_and_format_table(table)
 
     def get_shareholder_pattern(self) -> pd.DataFrame:
-        table = self.__tables[9]
+        table = self.__get_tables()[9]
         return self.read_and_format_table(table)
 
     def get_compounded_sales_growth(self) -> dict:
-        table = self.__tables[2]
+        table = self.__get_tables()[2]
         return self.read_and_format_table_to_dict(table=table)
 
     def get_compounded_profit_growth(self) -> dict:
-        table = self.__tables[3]
+        table = self.__get_tables()[3]
         return self.read_and_format_table_to_dict(table=table)
 
     def get_stock_price_cagr(self) -> dict:
-        table = self.__tables[4]
+        table = self.__get_tables()[4]
         return self.read_and_format_table_to_dict(table=table)
 
     def get_return_on_equity(self) -> dict:
-        table = self.__tables[5]
+        table = self.__get_tables()[5]
         return self.read_and_format_table_to_dict(table=table)
 
     def read_and_format_table(self, table: pd.DataFrame) -> pd.DataFrame:
-        table.rename(columns={'Unnamed: 0': ''}, inplace=True)
+        # cached tables are shared, so format a copy
+        table = table.rename(columns={'Unnamed: 0': ''})
         table[''] = table[''].str.replace('+', '')
         return table
 
@@ -128,3 +168,24 @@ class STicker:
         table = table.to_dict(orient='split')
         data = table['data']
         return {d[0][:-1]: d[1] for d in data}
+
+
+def load_company_page(link, max_age):
+    from bs4 import BeautifulSoup
+    page = page_memory.get(link, max_age)
+    if page is None:
+        stored = page_disk.get(link, max_age)
+        downloaded = stored is None
+        if downloaded:
+            response = http.get(link)
+            response.raise_for_status()
+            stored = {'html': response.text, 'fetched_at': time.time()}
+        # the soup and the tables are both parsed from a single download,
+        # and only a page that parses is kept
+        page = {'soup': BeautifulSoup(stored['html'], 'html.parser'),
+                'tables': pd.read_html(StringIO(stored['html'])),
+                'fetched_at': stored['fetched_at']}
+        if downloaded:
+            page_disk.set(link, stored, stored_at=stored['fetched_at'])
+        page_memory.set(link, page, stored_at=page['fetched_at'])
+    return page
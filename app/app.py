@@ -1,5 +1,6 @@
 import dash
 import dash_bootstrap_components as dbc
+import metrics
 
 app = dash.Dash(external_stylesheets=[dbc.themes.DARKLY],
                 external_scripts=[{
@@ -9,3 +10,4 @@ app = dash.Dash(external_stylesheets=[dbc.themes.DARKLY],
                 suppress_callback_exceptions=True,
                 title='Utonium')
 server = app.server
+metrics.install(server)
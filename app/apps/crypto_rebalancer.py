@@ -2,17 +2,43 @@ import dash
 import dash_html_components as html
 import dash_core_components as dcc
 import dash_bootstrap_components as dbc
-from dash.dependencies import Input, Output, State
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from dash.exceptions import PreventUpdate
-import plotly.express as px
 from app import app
 import pandas as pd
 import numpy as np
 import json
+import time
+import uuid
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from bar_store import BarStore
+from http_client import http
+from spot_prices import SpotPrices
+from cache import TTLCache
+from settings import settings
+from jobs import jobs, QUEUED, RUNNING, DONE, CANCELLED
+from optimizer import Portfolio, FrontierGrid, sample_portfolios,\
+    optimal_portfolios
 
+PRELOAD = ('plotly.express', 'scipy.optimize')
 MAX_SHARPE = 'max_sharpe'
 MIN_VOL = 'min_vol'
+MONTE_CARLO = 'monte_carlo'
+EXACT_LONG_ONLY = 'exact_long_only'
+EXACT = 'exact'
+MAX_FETCH_WORKERS = 8
+AGGREGATE_EXCHANGE = 'CCCAGG'
+BAR_SECONDS = {'day': 86400, 'hour': 3600, 'minute': 60}
+RESULT_TTL = 60 * 60
+
+bar_store = BarStore()
+# repeated rebalances within a few seconds reuse the same prices
+spot_prices = SpotPrices()
+
+# optimization results stay on the server, the browser only holds their id
+result_store = TTLCache(maxsize=64, ttl=RESULT_TTL,
+                        name='optimization_results')
 
 layout = dbc.Container([
     dbc.Form([
@@ -39,12 +65,30 @@ layout = dbc.Container([
                     dbc.Input(type="number", id="c-optimize-dp-input",
                               placeholder="Enter number of data points",
                               value=365)]),
+                dbc.InputGroup([
+                    dbc.InputGroupAddon("Method", addon_type="prepend"),
+                    dbc.Select(id='c-optimize-method-select',
+                               options=[
+                                   {"label": "Monte Carlo",
+                                    "value": MONTE_CARLO},
+                                   {"label": "Exact (long only)",
+                                    "value": EXACT_LONG_ONLY},
+                                   {"label": "Exact (short allowed)",
+                                    "value": EXACT},
+                               ],
+                               value=MONTE_CARLO,
+                               )]),
                 dbc.InputGroup([
                     dbc.InputGroupAddon(
                         "# of Portfolios", addon_type="prepend"),
                     dbc.Input(type="number", id="c-optimize-ports-input",
                               placeholder="Enter number of portfolios",
                               value=50000)]),
+                dbc.InputGroup([
+                    dbc.InputGroupAddon("Seed", addon_type="prepend"),
+                    dbc.Input(type="number", id="c-optimize-seed-input",
+                              placeholder="Random seed (optional)",
+                              min=0, step=1)]),
                 dbc.InputGroup([
                     dbc.InputGroupAddon(
                         "Risk Free Rate", addon_type="prepend"),
@@ -64,70 +108,72 @@ layout = dbc.Container([
         dbc.Label(id='c-optimize-form-feedback')
     ]),
     dbc.Row(html.Br()),
-    dbc.Row(dbc.Spinner(dbc.Container(
-        id='c-optimize-output', fluid=True), type="grow"),
-        justify='center'),
+    dbc.Row([
+        dbc.Col(dbc.Container(id='c-optimize-progress', fluid=True)),
+        dbc.Col(dbc.ButtonGroup([
+            dbc.Button('Stop', id='c-optimize-stop-button',
+                       color='primary', disabled=True),
+            dbc.Button('Cancel', id='c-optimize-cancel-button',
+                       color='secondary', disabled=True),
+        ]), width='auto'),
+    ], align='center'),
+    dbc.Row(html.Br()),
+    dbc.Row(dbc.Container(id='c-optimize-output', fluid=True),
+            justify='center'),
     dbc.Row(html.Br()),
     dbc.Row(dbc.Spinner(dbc.Container(
         id='c-rebalance-output', fluid=True), type='grow'),
         justify='center'),
-    dcc.Store(id='optimization-results')
+    dcc.Store(id='optimization-results'),
+    dcc.Store(id='c-optimize-job'),
+    dcc.Interval(id='c-optimize-interval', interval=1000, disabled=True)
 ], fluid=True)
 
 
-@app.callback([
-    Output('c-optimize-form-feedback', 'children'),
-    Output('c-optimize-symbols-input', 'valid'),
-    Output('c-optimize-symbols-input', 'invalid'),
-    Output('c-optimize-ports-input', 'valid'),
-    Output('c-optimize-ports-input', 'invalid'),
-    Output('c-optimize-dp-input', 'valid'),
-    Output('c-optimize-dp-input', 'invalid'),
-    Output('c-optimize-rfr-input', 'valid'),
-    Output('c-optimize-rfr-input', 'invalid'),
-],
+app.clientside_callback(
+    ClientsideFunction(namespace='crypto_rebalancer',
+                       function_name='form_feedback'),
+    [
+        Output('c-optimize-form-feedback', 'children'),
+        Output('c-optimize-symbols-input', 'valid'),
+        Output('c-optimize-symbols-input', 'invalid'),
+        Output('c-optimize-ports-input', 'valid'),
+        Output('c-optimize-ports-input', 'invalid'),
+        Output('c-optimize-dp-input', 'valid'),
+        Output('c-optimize-dp-input', 'invalid'),
+        Output('c-optimize-rfr-input', 'valid'),
+        Output('c-optimize-rfr-input', 'invalid'),
+    ],
     [
         Input('c-optimize-symbols-input', 'value'),
         Input('c-optimize-ports-input', 'value'),
         Input('c-optimize-dp-input', 'value'),
         Input('c-optimize-rfr-input', 'value'),
-],
+    ],
     [
         State('c-optimize-symbols-input', 'value'),
         State('c-optimize-ports-input', 'value'),
         State('c-optimize-dp-input', 'value'),
         State('c-optimize-rfr-input', 'value'),
-]
+    ]
 )
-def form_feedback(*args):
-    ctx = dash.callback_context
-    feedback_text = ''
-    symbols = ctx.states['c-optimize-symbols-input.value']
-    ports = ctx.states['c-optimize-ports-input.value']
-    dp = ctx.states['c-optimize-dp-input.value']
-    rfr = ctx.states['c-optimize-rfr-input.value']
-    symbols_bool = symbols is None or symbols == ''
-    ports_bool = ports is None or ports <= 0
-    dp_bool = dp is None or dp <= 0
-    rfr_bool = rfr is None
-    if symbols_bool:
-        feedback_text += 'Symbols required!!'
-    if ports_bool:
-        feedback_text += ' Number of portfolios has to be positive number!!'
-    if dp_bool:
-        feedback_text += ' Number of data points has to be positive number!!'
-    if rfr_bool:
-        feedback_text += ' Risk free rate cannot be empty!!'
-    return feedback_text, not symbols_bool, symbols_bool, not ports_bool, ports_bool, not dp_bool, dp_bool, not rfr_bool, rfr_bool
 
 
 @app.callback(
     [
         Output('c-optimize-output', 'children'),
-        Output('optimization-results', 'data')
+        Output('optimization-results', 'data'),
+        Output('c-optimize-job', 'data'),
+        Output('c-optimize-interval', 'disabled'),
+        Output('c-optimize-progress', 'children'),
+        Output('c-optimize-cancel-button', 'disabled'),
+        Output('c-optimize-stop-button', 'disabled'),
     ],
     [
-        Input('c-optimize-go-button', 'n_clicks')
+        Input('c-optimize-go-button', 'n_clicks'),
+        Input('c-optimize-interval', 'n_intervals'),
+        Input('c-optimize-cancel-button', 'n_clicks'),
+        Input('c-optimize-stop-button', 'n_clicks'),
     ],
     [
         State('c-optimize-symbols-input', 'value'),
@@ -135,11 +181,28 @@ def form_feedback(*args):
         State('c-optimize-dp-input', 'value'),
         State('c-optimize-ports-input', 'value'),
         State('c-optimize-rfr-input', 'value'),
+        State('c-optimize-method-select', 'value'),
+        State('c-optimize-seed-input', 'value'),
+        State('c-optimize-job', 'data'),
     ])
-def display_optimize_output(n_clicks, symbols: str,
-                            freq: str, no_of_data_points: int,
-                            num_portfolios: int, rfr: float):
-    data = pd.DataFrame()
+def display_optimize_output(n_clicks, n_intervals, cancel_clicks,
+                            stop_clicks,
+                            symbols: str, freq: str, no_of_data_points: int,
+                            num_portfolios: int, rfr: float,
+                            method: str = MONTE_CARLO, seed: int = None,
+                            job_id: str = None):
+    ctx = dash.callback_context
+    trigger = ctx.triggered[0]['prop_id'].split('.')[0]
+    if trigger == 'c-optimize-cancel-button':
+        # the next poll reports the job as cancelled
+        jobs.cancel(job_id)
+        raise PreventUpdate
+    if trigger == 'c-optimize-stop-button':
+        # sampling ends after the current chunk with the best so far
+        jobs.stop(job_id)
+        raise PreventUpdate
+    if trigger == 'c-optimize-interval':
+        return poll_optimization(job_id)
     if n_clicks is None:
         raise PreventUpdate
     if symbols is None:
@@ -149,59 +212,135 @@ def display_optimize_output(n_clicks, symbols: str,
     if no_of_data_points <= 0:
         raise PreventUpdate
     else:
-        try:
-            with open('config.json', 'r') as file:
-                config = json.load(file)['crypto']
-            api_key = config['crypto_compare_api_key']
-            if api_key == "":
-                return dbc.Alert(dcc.Markdown('''
-                API key not provided in config.json.
-                Please get api key from
-                [CryptoComapre](https://min-api.cryptocompare.com)
-                '''), color="danger"),
-            symbol_list = [symbol.strip() for symbol in symbols.split(',')]
-            print("Symbols:", ','.join(symbol_list))
-            for symbol in symbol_list:
-                data[symbol] = get_crypto_data(
-                    symbol, api_key, frequency=freq,
-                    no_of_data_points=no_of_data_points,
-                    exchange=None)['Close']
-            data = data[(data != 0).all(1)]
-            symbol_dict = {s: 0 for s in symbol_list}
-            layout, optimization_results = show_optimization_results(
-                assets=symbol_list, data=data,
-                num_portfolios=num_portfolios, rfr=rfr)
-            result = dbc.Col([
-                dbc.Row(dcc.Graph(figure=get_corr_matrix_heatmap(data)),
-                        align='center', justify='center'),
-                dbc.Row(dbc.Col(layout),
-                        align='center', justify='center'),
-                dbc.Row(
-                    dbc.InputGroup(
-                        [
-                            dbc.InputGroupAddon(
-                                "Portfolio",
-                                addon_type="prepend"),
-                            dbc.Textarea(id="c-portfolio-text-area-input",
-                                         value=json.dumps(
-                                             symbol_dict, indent=4),
-                                         bs_size='lg',
-                                         style={'height': '20rem'}),
-                            dbc.InputGroupAddon(
-                                dbc.Button("Rebalance",
-                                           id="c-rebalance-button",
-                                           color='primary'),
-                                addon_type="append",
-                            ),
-                        ],
+        api_key = settings.crypto_compare_api_key()
+        if api_key == "":
+            return get_idle_outputs(dbc.Alert(dcc.Markdown('''
+            API key not provided in config.json.
+            Please get api key from
+            [CryptoComapre](https://min-api.cryptocompare.com)
+            '''), color="danger"), None)
+        if job_id:
+            jobs.cancel(job_id)
+        symbol_list = [symbol.strip() for symbol in symbols.split(',')]
+        print("Symbols:", ','.join(symbol_list))
+        job_id = jobs.submit(run_optimization, symbol_list, api_key,
+                             freq=freq, no_of_data_points=no_of_data_points,
+                             num_portfolios=num_portfolios, rfr=rfr,
+                             method=method,
+                             seed=None if seed is None else int(seed))
+        return None, None, job_id, False, get_progress_view(jobs.get(job_id)),\
+            False, False
+
+
+def poll_optimization(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return get_idle_outputs(dash.no_update, dash.no_update)
+    if job.status in (QUEUED, RUNNING):
+        progress = job.progress
+        partial = dash.no_update
+        if MAX_SHARPE in progress:
+            partial = dbc.Col(
+                get_port_view('Max Sharpe Portfolio (so far)',
+                              progress[MAX_SHARPE]) +
+                get_port_view('Min Volatitlity Portfolio (so far)',
+                              progress[MIN_VOL]))
+        return partial, dash.no_update, dash.no_update, False, \
+            get_progress_view(job), False, False
+    if job.status == DONE:
+        return get_idle_outputs(*job.result)
+    if job.status == CANCELLED:
+        return get_idle_outputs(
+            dbc.Alert("Optimization cancelled", color="warning"), None)
+    return get_idle_outputs(dbc.Alert(dcc.Markdown('''
+    Exception occured {0}: {1}
+    '''.format(type(job.error).__name__, job.error)), color="danger"), None)
+
+
+def get_idle_outputs(output, result_id):
+    # clears the job, stops polling and disables the job buttons
+    return output, result_id, None, True, None, True, True
+
+
+def get_progress_view(job):
+    progress = job.progress
+    if job.status == QUEUED:
+        text = 'Waiting for a free optimizer'
+    elif 'evaluated' in progress:
+        text = f"Evaluated {progress['evaluated']:,} of " + \
+            f"{progress['total']:,} portfolios, best Sharpe ratio so far " + \
+            f"{progress['best_sharpe']:.4f}, unchanged for the last " + \
+            f"{progress['evaluated'] - progress['improved_at']:,}"
+    else:
+        text = progress.get('stage', 'Starting')
+    value = 100
+    if 'evaluated' in progress:
+        value = 100 * progress['evaluated'] / progress['total']
+    return [dbc.Progress(value=value, striped=True, animated=True),
+            dbc.Label(text)]
+
+
+def run_optimization(job, symbol_list, api_key, freq, no_of_data_points,
+                     num_portfolios, rfr, method, seed=None):
+    job.report(stage='Fetching prices')
+    data, errors = get_close_prices(
+        symbol_list, api_key, frequency=freq,
+        no_of_data_points=no_of_data_points)
+    if data.empty:
+        return get_fetch_errors_alert(errors, color="danger"), None
+    symbol_list = list(data.columns)
+    data = data[(data != 0).all(1)]
+    symbol_dict = {s: 0 for s in symbol_list}
+    job.report(stage='Optimizing')
+
+    def on_chunk(evaluated, min_vol, max_sharpe):
+        improved_at = job.progress.get('improved_at', evaluated)
+        if max_sharpe.sharpe > job.progress.get('best_sharpe', -np.inf):
+            improved_at = evaluated
+        job.report(evaluated=evaluated, total=num_portfolios,
+                   best_sharpe=max_sharpe.sharpe, improved_at=improved_at,
+                   **{MIN_VOL: get_dict_result(
+                       get_portfolio_frame(symbol_list, min_vol)),
+                      MAX_SHARPE: get_dict_result(
+                       get_portfolio_frame(symbol_list, max_sharpe))})
+        return job.is_stopped()
+
+    layout, optimization_results = show_optimization_results(
+        assets=symbol_list, data=data,
+        num_portfolios=num_portfolios, rfr=rfr, method=method,
+        on_chunk=on_chunk, seed=seed)
+    result = dbc.Col(([
+        dbc.Row(get_fetch_errors_alert(errors, color="warning"),
+                align='center', justify='center')
+    ] if errors else []) + [
+        dbc.Row(dcc.Graph(figure=get_corr_matrix_heatmap(data)),
+                align='center', justify='center'),
+        dbc.Row(dbc.Col(layout),
+                align='center', justify='center'),
+        dbc.Row(
+            dbc.InputGroup(
+                [
+                    dbc.InputGroupAddon(
+                        "Portfolio",
+                        addon_type="prepend"),
+                    dbc.Textarea(id="c-portfolio-text-area-input",
+                                 value=json.dumps(
+                                     symbol_dict, indent=4),
+                                 bs_size='lg',
+                                 style={'height': '20rem'}),
+                    dbc.InputGroupAddon(
+                        dbc.Button("Rebalance",
+                                   id="c-rebalance-button",
+                                   color='primary'),
+                        addon_type="append",
                     ),
-                )
-            ])
-            return result, optimization_results
-        except Exception as e:
-            return dbc.Alert(dcc.Markdown('''
-            Exception occured {0}: {1}
-            '''.format(e)), color="danger"), {}
+                ],
+            ),
+        )
+    ])
+    result_id = uuid.uuid4().hex
+    result_store.set(result_id, optimization_results)
+    return result, result_id
 
 
 @app.callback(
@@ -212,13 +351,17 @@ def display_optimize_output(n_clicks, symbols: str,
         State('optimization-results', 'data')
     ]
 )
-def display_rebalance_output(n_clicks, text_area: str, results):
+def display_rebalance_output(n_clicks, text_area: str, result_id: str):
     if not n_clicks:
         raise PreventUpdate
     if not text_area:
         raise PreventUpdate
-    if not results:
+    if not result_id:
         raise PreventUpdate
+    results = result_store.get(result_id)
+    if results is None:
+        return dbc.Alert("Optimization results expired, please optimize"
+                         " again", color="warning")
     try:
         portfolio = json.loads(text_area)
     except(Exception):
@@ -226,17 +369,14 @@ def display_rebalance_output(n_clicks, text_area: str, results):
     min_vol = results[MIN_VOL]['Expected Weights']
     max_sharpe = results[MAX_SHARPE]['Expected Weights']
     symbols = portfolio.keys()
-    with open('config.json', 'r') as file:
-        config = json.load(file)['crypto']
-    api_key = config['crypto_compare_api_key']
-    url = 'https://min-api.cryptocompare.com/data/pricemulti'
-    params = {
-        "fsyms": ','.join(symbols),
-        "tsyms": "USD",
-        "api_key": api_key
-    }
-    exchange_rate = requests.get(url, params=params).json()
-    usd_price = {key: value['USD'] for key, value in exchange_rate.items()}
+    try:
+        usd_price = spot_prices.get(symbols, settings.crypto_compare_api_key())
+    except(ValueError, requests.RequestException) as e:
+        return dbc.Alert(f"Could not fetch prices: {e}", color="danger")
+    unpriced = [symbol for symbol in symbols if symbol not in usd_price]
+    if unpriced:
+        return dbc.Alert(f"No USD price for: {', '.join(unpriced)}",
+                         color="danger")
     display_result = {}
     results = pd.DataFrame(
         {"a": portfolio, 'usd_price': usd_price})
@@ -270,6 +410,7 @@ def display_rebalance_output(n_clicks, text_area: str, results):
 
 
 def get_corr_matrix_heatmap(data: pd.DataFrame):
+    import plotly.express as px
     returns = np.log(data / data.shift(1))
     fig = px.imshow(returns.corr(),
                     labels=dict(x="Coins", y="Coins", color="Correlation"),)
@@ -280,20 +421,63 @@ def get_corr_matrix_heatmap(data: pd.DataFrame):
     return fig
 
 
+def get_fetch_errors_alert(errors: dict, color: str):
+    return dbc.Alert([
+        html.H5("Could not fetch data for:"),
+        html.Ul([html.Li(f"{symbol}: {error}")
+                 for symbol, error in errors.items()])
+    ], color=color)
+
+
+def get_close_prices(symbol_list: list, api_key, to_symbol='USD',
+                     frequency='day', exchange=None,
+                     no_of_data_points=100):
+    closes, errors = {}, {}
+
+    def fetch(symbol):
+        return get_crypto_data(symbol, api_key, to_symbol=to_symbol,
+                               frequency=frequency, exchange=exchange,
+                               no_of_data_points=no_of_data_points)['Close']
+
+    with ThreadPoolExecutor(
+            max_workers=min(MAX_FETCH_WORKERS, len(symbol_list))) as pool:
+        futures = {pool.submit(fetch, symbol): symbol
+                   for symbol in symbol_list}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                closes[symbol] = future.result()
+            except Exception as e:
+                errors[symbol] = f'{type(e).__name__}: {e}'
+    fetched = [symbol for symbol in symbol_list if symbol in closes]
+    if not fetched:
+        return pd.DataFrame(), errors
+    # align every symbol on the dates they all have
+    data = pd.concat([closes[symbol] for symbol in fetched], axis=1,
+                     keys=fetched, join='inner')
+    return data, errors
+
+
 def get_crypto_data(symbol, api_key, to_symbol='USD', frequency='day',
                     exchange='Binance', no_of_data_points=100):
     if frequency == 'day' or frequency == 'hour' or frequency == 'minute':
-        link = 'https://min-api.cryptocompare.com/data/v2/histo'+frequency
-        params = {
-            "fsym": symbol,
-            "tsym": to_symbol,
-            "limit": no_of_data_points,
-            "api_key": api_key
-        }
-        if exchange is not None:
-            params['e'] = exchange
-        data_json = requests.get(link, params=params).json()
-        data_dict = data_json['Data']['Data']
+        key = (symbol.upper(), to_symbol.upper(), frequency,
+               exchange or AGGREGATE_EXCHANGE)
+        period = BAR_SECONDS[frequency]
+        now = int(time.time())
+        latest = now - now % period
+        since = latest - no_of_data_points * period
+        stored = bar_store.load(key, since)
+        limit = no_of_data_points
+        # only top up when the store holds every bar from `since` onwards
+        if stored and stored[0]['time'] == since and \
+                len(stored) == (stored[-1]['time'] - since) // period + 1:
+            # refetch the last stored bar as it may have been incomplete
+            limit = max(1, (latest - stored[-1]['time']) // period)
+        bar_store.save(key, fetch_crypto_bars(
+            symbol, api_key, to_symbol=to_symbol, frequency=frequency,
+            exchange=exchange, limit=limit))
+        data_dict = bar_store.load(key, since)
         df = pd.DataFrame(data_dict,
                           columns=['close', 'high', 'low', 'open',
                                    'time', 'volumefrom', 'volumeto'],
@@ -309,53 +493,50 @@ def get_crypto_data(symbol, api_key, to_symbol='USD', frequency='day',
         return pd.DataFrame()
 
 
-def portfolio_annualised_performance(weights, mean_returns,
-                                     cov_matrix, no_of_days):
-    returns = np.sum(np.dot(mean_returns, weights)) * no_of_days
-    std = np.sqrt(np.dot(weights.T, np.dot(
-        cov_matrix, weights))) * np.sqrt(no_of_days)
-    return std, returns
+def fetch_crypto_bars(symbol, api_key, to_symbol='USD', frequency='day',
+                      exchange='Binance', limit=100):
+    link = 'https://min-api.cryptocompare.com/data/v2/histo'+frequency
+    params = {
+        "fsym": symbol,
+        "tsym": to_symbol,
+        "limit": limit,
+        "api_key": api_key
+    }
+    if exchange is not None:
+        params['e'] = exchange
+    data_json = http.get(link, params=params).json()
+    if data_json.get('Response') == 'Error':
+        raise ValueError(data_json.get('Message'))
+    return data_json['Data']['Data']
 
 
 def fetch_expected_weights(assets: list, d: pd.DataFrame,
                            num_portfolios: int = 10000,
-                           rfr=0.05, no_of_days=365):
+                           rfr=0.05, no_of_days=365, on_chunk=None,
+                           seed=None):
 
     returns = np.log(d / d.shift(1))
     mean_returns = returns.mean()
     cov_matrix = returns.cov()
-    num_assets = len(assets)
-    port_returns = []
-    port_volatility = []
-    sharpe_ratio = []
-    stock_weights = []
-
-    for i in range(num_portfolios):
-        weights = np.random.random_sample(num_assets)
-        weights /= np.sum(weights)
-        volatility, ret = portfolio_annualised_performance(
-            weights, mean_returns, cov_matrix, no_of_days)
-        stock_weights.append(weights)
-        port_returns.append(ret)
-        port_volatility.append(volatility)
-        sharpe = (ret-rfr) / volatility
-        sharpe_ratio.append(sharpe)
-
-    portfolio = {'Returns': port_returns,
-                 'Volatility': port_volatility,
-                 'Sharpe Ratio': sharpe_ratio}
+    min_volatility_port, max_sharpe_port, frontier = sample_portfolios(
+        mean_returns.values, cov_matrix.values,
+        num_portfolios=num_portfolios, rfr=rfr, no_of_days=no_of_days,
+        on_chunk=on_chunk, seed=seed,
+        workers=settings.optimizer_workers())
+    return get_dict_result(get_portfolio_frame(assets, min_volatility_port)),\
+        get_dict_result(get_portfolio_frame(assets, max_sharpe_port)),\
+        frontier
+
+
+def get_portfolio_frame(assets: list, port: Portfolio) -> pd.DataFrame:
+    portfolio = {'Returns': [port.returns],
+                 'Volatility': [port.volatility],
+                 'Sharpe Ratio': [port.sharpe]}
     for counter, symbol in enumerate(assets):
-        portfolio[symbol] = [Weight[counter] for Weight in stock_weights]
-    df = pd.DataFrame(portfolio)
+        portfolio[symbol] = [port.weights[counter]]
     column_order = ['Returns', 'Volatility', 'Sharpe Ratio']
     column_order = column_order + [stock for stock in assets]
-    df = df[column_order]
-    max_sharpe = df['Sharpe Ratio'].max()
-    min_volatility = df['Volatility'].min()
-    max_sharpe_port = df.loc[df['Sharpe Ratio'] == max_sharpe]
-    min_volatility_port = df.loc[df['Volatility'] == min_volatility]
-    return get_dict_result(min_volatility_port),\
-        get_dict_result(max_sharpe_port)
+    return pd.DataFrame(portfolio)[column_order]
 
 
 def get_dict_result(portfolio: pd.DataFrame):
@@ -370,18 +551,82 @@ def get_dict_result(portfolio: pd.DataFrame):
     return results
 
 
+def fetch_optimal_weights(assets: list, d: pd.DataFrame,
+                          rfr=0.05, no_of_days=365, long_only=True):
+    returns = np.log(d / d.shift(1))
+    min_vol, max_sharpe, frontier = optimal_portfolios(
+        returns.mean().values, returns.cov().values, rfr=rfr,
+        no_of_days=no_of_days, long_only=long_only)
+    return get_dict_result(get_portfolio_frame(assets, min_vol)),\
+        get_dict_result(get_portfolio_frame(assets, max_sharpe)),\
+        frontier
+
+
+def get_frontier_chart(frontier, min_vol: dict, max_sharpe: dict):
+    import plotly.graph_objects as go
+    # only aggregates are plotted, so the figure size does not grow with
+    # the number of sampled portfolios
+    fig = go.Figure()
+    if isinstance(frontier, FrontierGrid):
+        volatility = (frontier.volatility_edges[:-1] +
+                      frontier.volatility_edges[1:]) / 2
+        returns = (frontier.returns_edges[:-1] +
+                   frontier.returns_edges[1:]) / 2
+        counts = frontier.counts.T
+        fig.add_heatmap(x=volatility, y=returns,
+                        z=np.where(counts > 0, counts, np.nan),
+                        colorscale='Viridis', name='Portfolios',
+                        colorbar=dict(title='Portfolios'))
+        sampled = np.isfinite(frontier.envelope)
+        fig.add_trace(go.Scattergl(x=volatility[sampled],
+                                   y=frontier.envelope[sampled],
+                                   mode='lines', name='Frontier',
+                                   line=dict(color='#FFFFFF')))
+    else:
+        fig.add_trace(go.Scattergl(x=[port.volatility for port in frontier],
+                                   y=[port.returns for port in frontier],
+                                   mode='lines', name='Frontier',
+                                   line=dict(color='#FFFFFF')))
+    fig.add_trace(go.Scattergl(x=[max_sharpe['Volatility']],
+                               y=[max_sharpe['Returns']],
+                               mode='markers', name='Max Sharpe',
+                               marker=dict(color='#00bc8c', size=12)))
+    fig.add_trace(go.Scattergl(x=[min_vol['Volatility']],
+                               y=[min_vol['Returns']],
+                               mode='markers', name='Min Volatility',
+                               marker=dict(color='#f39c12', size=12)))
+    fig.update_layout(showlegend=True,
+                      xaxis_title="Volatility",
+                      yaxis_title="Returns",
+                      legend=dict(x=0, y=1),
+                      plot_bgcolor="#000000",
+                      paper_bgcolor="#222222",
+                      font={'color': "#FFFFFF"})
+    return fig
+
+
 def show_optimization_results(assets, data,
                               num_portfolios: int = 10000,
-                              rfr=0.05, no_of_days=365):
-    min_vol, max_sharpe = fetch_expected_weights(assets=assets, d=data,
-                                                 num_portfolios=num_portfolios,
-                                                 rfr=rfr,
-                                                 no_of_days=no_of_days)
+                              rfr=0.05, no_of_days=365,
+                              method=MONTE_CARLO, on_chunk=None,
+                              seed=None):
+    if method == MONTE_CARLO:
+        min_vol, max_sharpe, frontier = fetch_expected_weights(
+            assets=assets, d=data, num_portfolios=num_portfolios,
+            rfr=rfr, no_of_days=no_of_days, on_chunk=on_chunk,
+            seed=seed)
+    else:
+        min_vol, max_sharpe, frontier = fetch_optimal_weights(
+            assets=assets, d=data, rfr=rfr, no_of_days=no_of_days,
+            long_only=method == EXACT_LONG_ONLY)
+    layout = [dbc.Row(dcc.Graph(figure=get_frontier_chart(
+        frontier, min_vol, max_sharpe)),
+        align='center', justify='center')]
     results = {}
     results[MIN_VOL] = min_vol
     results[MAX_SHARPE] = max_sharpe
     return get_port_view('Max Sharpe Portfolio', max_sharpe) + \
-        get_port_view('Min Volatitlity Portfolio', min_vol), results
+        get_port_view('Min Volatitlity Portfolio', min_vol) + layout, results
 
 
 def get_port_view(name, port):
@@ -1,18 +1,29 @@
+import dash
 import dash_html_components as html
 import dash_core_components as dcc
 import dash_bootstrap_components as dbc
 import dash_trich_components as dtc
-from dash.dependencies import Input, Output, State
+import dash_table
+from dash.dependencies import Input, Output, State, ClientsideFunction
 from dash_dangerously_set_inner_html import DangerouslySetInnerHTML
 from dash.exceptions import PreventUpdate
 from app import app
-import json
+from settings import settings
+from cache import TTLCache
 import datetime
 from urllib.parse import urlparse
-import dash
-from pycoingecko import CoinGeckoAPI
-import pandas as pd
+from http_client import get_coingecko
+from coin_index import coin_index
+
+PRELOAD = ('pycoingecko',)
+TICKERS_PAGE_SIZE = 20
+# CoinGecko pages tickers by 100
+UPSTREAM_TICKERS_PAGE_SIZE = 100
 
+# coin details and ticker pages are fetched once per section and kept for
+# the follow up callbacks of the same view
+coin_cache = TTLCache(maxsize=32, ttl=5 * 60, name='coins')
+ticker_cache = TTLCache(maxsize=256, ttl=5 * 60, name='tickers')
 
 layout = html.Div([
     dbc.Row(
@@ -36,13 +47,15 @@ layout = html.Div([
     ),
     dbc.Row(html.Br()),
     dbc.Row(dbc.Container(id='crypto-output', fluid=True)),
-    dcc.Store(id='current-price-store')
+    dcc.Store(id='current-price-store'),
+    dcc.Store(id='crypto-coin-id')
 ])
 
 
 @app.callback(
     [Output('crypto-output', 'children'),
-     Output('current-price-store', 'data')],
+     Output('current-price-store', 'data'),
+     Output('crypto-coin-id', 'data')],
     [Input('crypto-go-button', 'n_clicks')],
     [State('crypto-symbol-input', 'value')])
 def display_value(n_clicks, symbol: str):
@@ -51,20 +64,13 @@ def display_value(n_clicks, symbol: str):
     if symbol is None:
         raise PreventUpdate
     else:
-        symbol = symbol.upper()
-        cg = CoinGeckoAPI()
-        coin_list = cg.get_coins_list()
-        coin_list_df = pd.DataFrame.from_records(coin_list)
-        coin_list_df['symbol'] = coin_list_df['symbol'].str.upper()
-        coin_list_df.set_index('symbol', inplace=True)
+        symbol = symbol.upper().strip()
+        # unknown symbols are treated as slugs
+        coin_id = coin_index.resolve(symbol) or symbol.lower()
         try:
-            data = cg.get_coin_by_id(
-                str(coin_list_df.loc[symbol].id), localization='false')
-        except(ValueError, KeyError):
-            # treating symbol as slug
-            data = cg.get_coin_by_id(
-                symbol.lower(), localization='false')
-            symbol = data['symbol']
+            data = fetch_coin(coin_id)
+        except(ValueError):
+            data = None
         if not data:
             return dbc.Alert(dcc.Markdown('''
             Could not fetch data for symbol : **{0}**.
@@ -72,16 +78,7 @@ def display_value(n_clicks, symbol: str):
             Check [CoinGecko](https://www.coingecko.com/en)
              or [CoinMarketCap](https://coinmarketcap.com/)
              for a valid symbol.
-            '''.format(symbol)), color="danger"),
-        with open('config.json', 'r') as file:
-            config = json.load(file)['crypto']
-        tickers = [ticker for ticker in data['tickers'] if ticker['market']
-                   ['identifier'] in config['viewer']['markets']]
-        if len(tickers) <= 4 or config['viewer']['markets'][0] == "*":
-            tickers = data['tickers']
-        tickers = sorted(tickers, key=lambda t: t['market']['identifier'])
-        markets = sorted(list(set([t['market']['identifier']
-                                   for t in data['tickers']])))
+            '''.format(symbol)), color="danger"), None, None
         market_data = get_market_data(data=data)
         stats = {
             "Current Price": f'${market_data["current_price"]["usd"]:,}',
@@ -97,8 +94,8 @@ def display_value(n_clicks, symbol: str):
         col2 = {k: market_data[k] for k in market_data if "percentage" in k}
         current_price = data['market_data']['current_price']
         return [
-            dbc.Container(get_ticker_carousel(tickers=tickers),
-                          fluid=True),
+            dbc.Container(id='tickers-carousel', fluid=True),
+            dbc.Container(get_tickers_table(), fluid=True),
             html.Hr(),
             dbc.Container(dbc.Row([
                 dbc.Col([
@@ -115,7 +112,7 @@ def display_value(n_clicks, symbol: str):
                     html.Br(),
                     display_contract_address(data=data),
                     html.Br(),
-                    get_avalable_markets_popover(markets=markets),
+                    get_avalable_markets_popover(),
                 ]),
                 dbc.Col(
                     dbc.Table([
@@ -132,10 +129,7 @@ def display_value(n_clicks, symbol: str):
             ], align='center', justify='center')),
             dbc.Modal([
                 dbc.ModalHeader('Description'),
-                dbc.ModalBody([
-                    DangerouslySetInnerHTML(
-                        '<p>' + data['description']['en'] + '</p>')
-                ]),
+                dbc.ModalBody(id='description-modal-body'),
                 dbc.ModalFooter(
                     dbc.Button("Close", id="description-modal-close",
                                color='secondary')
@@ -148,16 +142,114 @@ def display_value(n_clicks, symbol: str):
             html.Hr(),
             # dbc.Row(children=[
             dbc.Container(get_currency_tabs(
-                col1=col1, col2=col2, config=config)),
+                col1=col1, col2=col2,
+                currencies=settings.pref_currencies())),
             # ]),
             html.Hr(),
-            dbc.Container(dbc.Row(get_stats(data=data),
-                                  align='start', justify='center',
-                                  style={'height': '100rem'}))
-        ], current_price
+            dbc.Container([
+                dbc.Button('Social & Github Stats',
+                           id='stats-collapse-button', color='secondary'),
+                html.Br(),
+                html.Br(),
+                dbc.Collapse(dbc.Spinner(dbc.Row(
+                    id='stats-output', align='start', justify='center')),
+                    id='stats-collapse', is_open=False),
+            ])
+        ], current_price, coin_id
+
+
+def fetch_coin(coin_id):
+    # only what the header, stats table and converter need, the other
+    # sections load in their own callbacks once opened
+    data = get_coingecko().get_coin_by_id(
+        coin_id, localization='false', tickers='false',
+        community_data='false', developer_data='false')
+    coin_cache.set(coin_id, data)
+    return data
+
+
+def get_coin(coin_id):
+    data = coin_cache.get(coin_id)
+    return fetch_coin(coin_id) if data is None else data
+
+
+def get_tickers_page(coin_id, page: int) -> list:
+    key = (coin_id, page)
+    tickers = ticker_cache.get(key)
+    if tickers is None:
+        tickers = get_coingecko().get_coin_ticker_by_id(
+            coin_id, page=page, order='volume_desc')['tickers']
+        ticker_cache.set(key, tickers)
+    return tickers
+
+
+@app.callback(
+    Output('tickers-carousel', 'children'),
+    [Input('crypto-coin-id', 'data')])
+def display_ticker_carousel(coin_id):
+    if coin_id is None:
+        raise PreventUpdate
+    # the first page holds the busiest tickers
+    all_tickers = sorted(get_tickers_page(coin_id, 1),
+                         key=get_ticker_volume, reverse=True)
+    markets = settings.markets()
+    tickers = [ticker for ticker in all_tickers if ticker['market']
+               ['identifier'] in markets]
+    if len(tickers) <= 4 or markets[0] == "*":
+        tickers = all_tickers
+    # only the busiest tickers are animated, the rest are in the table
+    return get_ticker_carousel(tickers=tickers[:settings.carousel_tickers()])
+
+
+@app.callback(
+    Output('markets-popover-body', 'children'),
+    [Input('markets-popover', 'is_open')],
+    [State('crypto-coin-id', 'data')])
+def display_markets(is_open, coin_id):
+    if not is_open or coin_id is None:
+        raise PreventUpdate
+    # the busiest page is cached by the carousel already, walking every
+    # page would hold the request for the CoinGecko rate limit
+    markets = sorted(set(ticker['market']['identifier']
+                         for ticker in get_tickers_page(coin_id, 1)))
+    return ", ".join([m.upper() for m in markets]) if markets \
+        else "Not Available"
+
+
+@app.callback(
+    Output('description-modal-body', 'children'),
+    [Input('description-modal', 'is_open')],
+    [State('crypto-coin-id', 'data')])
+def display_description(is_open, coin_id):
+    if not is_open or coin_id is None:
+        raise PreventUpdate
+    return DangerouslySetInnerHTML(
+        '<p>' + get_coin(coin_id)['description']['en'] + '</p>')
+
 
+@app.callback(
+    Output('stats-output', 'children'),
+    [Input('stats-collapse', 'is_open')],
+    [State('crypto-coin-id', 'data')])
+def display_stats(is_open, coin_id):
+    if not is_open or coin_id is None:
+        raise PreventUpdate
+    data = get_coingecko().get_coin_by_id(
+        coin_id, localization='false', tickers='false',
+        market_data='false', community_data='true', developer_data='true')
+    return get_stats(data=data)
+
+
+app.clientside_callback(
+    ClientsideFunction(namespace='crypto_viewer',
+                       function_name='toggle_collapse'),
+    Output('stats-collapse', 'is_open'),
+    [Input('stats-collapse-button', 'n_clicks')],
+    [State('stats-collapse', 'is_open')],
+)
 
-def get_avalable_markets_popover(markets: list):
+
+def get_avalable_markets_popover():
     return dbc.Container(
         [
             dbc.Button(
@@ -168,8 +260,8 @@ def get_avalable_markets_popover(markets: list):
             dbc.Popover(
                 [
                     dbc.PopoverHeader("Markets"),
-                    dbc.PopoverBody(
-                        ", ".join([m.upper() for m in markets]) if markets else "Not Available"),
+                    dbc.PopoverBody(dbc.Spinner(size='sm'),
+                                    id='markets-popover-body'),
                 ],
                 id="markets-popover",
                 is_open=False,
@@ -179,15 +271,13 @@ def get_avalable_markets_popover(markets: list):
     )
 
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='crypto_viewer',
+                       function_name='toggle_popover'),
     Output("markets-popover", "is_open"),
     [Input("markets-popover-target", "n_clicks")],
     [State("markets-popover", "is_open")],
 )
-def toggle_popover(n, is_open):
-    if n:
-        return not is_open
-    return is_open
 
 
 def display_contract_address(data):
@@ -208,16 +298,14 @@ def display_contract_address(data):
         return dbc.Row()
 
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='crypto_viewer',
+                       function_name='toggle_modal'),
     Output("description-modal", "is_open"),
     [Input("description-modal-open", "n_clicks"),
      Input("description-modal-close", "n_clicks")],
     [State("description-modal", "is_open")],
 )
-def toggle_modal(n1, n2, is_open):
-    if n1 or n2:
-        return not is_open
-    return is_open
 
 
 def get_links(data: dict):
@@ -228,13 +316,17 @@ def get_links(data: dict):
         dbc.DropdownMenu([
             dbc.DropdownMenuItem(
                 urlparse(explorer).netloc,
-                href=explorer) for explorer in data['links']['blockchain_site'] if explorer != ""
+                href=explorer)
+            for explorer in data['links']['blockchain_site']
+            if explorer != ""
         ],
             label="Explorers"),
         dbc.DropdownMenu([
             dbc.DropdownMenuItem(
                 repo,
-                href=repo) for repo in data['links']['repos_url']['github'] if repo != ""
+                href=repo)
+            for repo in data['links']['repos_url']['github']
+            if repo != ""
         ],
             label="Github Repos")
     ])
@@ -315,6 +407,79 @@ def get_ticker_carousel(tickers):
     )
 
 
+def get_ticker_volume(ticker):
+    volume = ticker.get('converted_volume', {}).get('usd')
+    return volume if volume is not None else 0
+
+
+def get_tickers_table():
+    return html.Div([
+        dbc.Button('All Tickers', id='tickers-collapse-button',
+                   color='secondary', size='sm'),
+        dbc.Collapse(dash_table.DataTable(
+            id='tickers-table',
+            columns=[{'name': name, 'id': name} for name in
+                     ['Market', 'Pair', 'Last Price', 'Volume',
+                      'Volume (USD)', 'Spread %']],
+            page_action='custom',
+            page_current=0,
+            page_size=TICKERS_PAGE_SIZE,
+            style_header={'backgroundColor': '#303030',
+                          'fontWeight': 'bold'},
+            style_cell={'backgroundColor': '#222222',
+                        'color': '#FFFFFF',
+                        'textAlign': 'right'},
+            style_cell_conditional=[{'if': {'column_id': column},
+                                     'textAlign': 'left'}
+                                    for column in ['Market', 'Pair']],
+        ), id='tickers-collapse', is_open=False),
+    ])
+
+
+app.clientside_callback(
+    ClientsideFunction(namespace='crypto_viewer',
+                       function_name='toggle_collapse'),
+    Output('tickers-collapse', 'is_open'),
+    [Input('tickers-collapse-button', 'n_clicks')],
+    [State('tickers-collapse', 'is_open')],
+)
+
+
+@app.callback(
+    [Output('tickers-table', 'data'),
+     Output('tickers-table', 'page_count')],
+    [Input('tickers-collapse', 'is_open'),
+     Input('tickers-table', 'page_current')],
+    [State('tickers-table', 'page_size'),
+     State('crypto-coin-id', 'data')])
+def display_tickers_page(is_open, page_current, page_size, coin_id):
+    if not is_open or coin_id is None:
+        raise PreventUpdate
+    # table pages are cut out of the matching upstream page
+    page, start = divmod((page_current or 0) * page_size,
+                         UPSTREAM_TICKERS_PAGE_SIZE)
+    tickers = get_tickers_page(coin_id, page + 1)
+    page_count = dash.no_update
+    if len(tickers) < UPSTREAM_TICKERS_PAGE_SIZE:
+        # a short upstream page is the last one, so the total is known
+        total = page * UPSTREAM_TICKERS_PAGE_SIZE + len(tickers)
+        page_count = max(1, -(-total // page_size))
+    return [get_ticker_row(ticker) for ticker in
+            tickers[start:start + page_size]], page_count
+
+
+def get_ticker_row(ticker):
+    spread = ticker.get('bid_ask_spread_percentage')
+    return {
+        'Market': ticker['market']['name'],
+        'Pair': f"{get_base_name(ticker)} / {ticker['target']}",
+        'Last Price': ticker['last'],
+        'Volume': round(ticker['volume'], 2),
+        'Volume (USD)': round(get_ticker_volume(ticker), 2),
+        'Spread %': round(spread, 4) if spread is not None else None,
+    }
+
+
 def get_base_name(ticker):
     if len(ticker['base']) > 6:
         return ticker['coin_id'].upper()
@@ -403,7 +568,7 @@ def get_market_data(data):
     return market_data
 
 
-def get_currency_tabs(col1, col2, config):
+def get_currency_tabs(col1, col2, currencies):
     return dbc.Tabs([
                     dbc.Tab(
                         dbc.Container(dbc.Row([
@@ -438,7 +603,7 @@ def get_currency_tabs(col1, col2, config):
                                 borderless=True
                             )), ])), label=curr.upper(),
                         labelClassName="text-info"
-                    ) for curr in config['viewer']['pref_curr']
+                    ) for curr in currencies
                     ])
 
 
@@ -450,7 +615,10 @@ def pretty_print(value):
                                           "%Y-%m-%dT%H:%M:%S.%fZ").date()
 
 
-@app.callback(
+# the converters run in the browser against current-price-store
+app.clientside_callback(
+    ClientsideFunction(namespace='crypto_viewer',
+                       function_name='convert_from_eth'),
     Output('result-side-1', 'value'),
     [
         Input('curr-select-1', 'value'),
@@ -462,18 +630,11 @@ def pretty_print(value):
         State('current-price-store', 'data')
     ]
 )
-def convert_from_eth(*args):
-    ctx = dash.callback_context
-    cp = ctx.states['current-price-store.data']
-    amount = ctx.states['eth-side-1.value']
-    currency = ctx.states['curr-select-1.value']
-    if amount is None or currency is None:
-        raise PreventUpdate
-    else:
-        return round(amount*cp[currency], 3)
 
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace='crypto_viewer',
+                       function_name='convert_to_eth'),
     Output('eth-side-2', 'value'),
     [
         Input('curr-select-2', 'value'),
@@ -485,15 +646,6 @@ def convert_from_eth(*args):
         State('current-price-store', 'data')
     ]
 )
-def convert_to_eth(*args):
-    ctx = dash.callback_context
-    cp = ctx.states['current-price-store.data']
-    amount = ctx.states['result-side-2.value']
-    currency = ctx.states['curr-select-2.value']
-    if amount is None or currency is None:
-        raise PreventUpdate
-    else:
-        return f'{amount/cp[currency]: .7f}'
 
 
 def get_currency_converter(current_price, symbol):
@@ -6,14 +6,29 @@ import dash_bootstrap_components as dbc
 import dash_daq as daq
 from app import app
 from ScreenerTicker import STicker
-from yahooquery import Ticker
-from googlesearch import search
-from bs4 import BeautifulSoup
-import requests
-import plotly.express as px
+from moneycontrol import get_moneycontrol
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
 import pandas as pd
+import time
+import metrics
 # import dash_trich_components as dtc
 
+# imported on first use rather than at startup
+PRELOAD = ('yahooquery', 'plotly.express', 'bs4', 'googlesearch')
+UPSTREAM_TIMEOUTS = {
+    'history': 10,
+    'price': 10,
+    'asset_profile': 10,
+    'summary_detail': 10,
+    'screener': 15,
+    'peers': 20,
+    'moneycontrol': 20,
+}
+# per request to Yahoo, so a source does not outlive its deadline by much
+YAHOO_TIMEOUT = 5
+
+upstream_pool = ThreadPoolExecutor(max_workers=16)
+
 
 layout = html.Div([
     dbc.Row(
@@ -50,32 +65,34 @@ def display_value(n_clicks, symbol: str):
         raise PreventUpdate
     else:
         symbol = symbol.upper().strip()
-        ticker = symbol + ".NS"
-        yTicker = Ticker(ticker)
-        yearly_pricing_data = yTicker.history(
-            period='1y', interval='1d').loc[ticker]
-        yearly_pricing_data = yearly_pricing_data.reset_index()
-        pricing = yTicker.price[ticker]
-        sTicker = STicker(symbol=symbol)
-        yt_asset_profile = yTicker.asset_profile[ticker]
-        moneycontrol_url = get_moneycontrol_url(symbol=symbol)
-        moneycontrol_data = get_moneycontrol_data(moneycontrol_url)
-        key_stats = sTicker.get_key_stats()
+        data = fetch_upstream(symbol=symbol)
+        yearly_pricing_data = data['history']
+        pricing = data['price']
+        sTicker = data['screener']
+        yt_asset_profile = data['asset_profile'] or {}
+        moneycontrol_url, moneycontrol_data = data['moneycontrol'] or \
+            (None, None)
+        key_stats = sTicker.get_key_stats() if sTicker else {}
         return html.Div([dbc.Row(dbc.Container(
             [
-                html.H1(sTicker.get_company_name(), className="display-3"),
+                html.H1(sTicker.get_company_name() if sTicker else symbol,
+                        className="display-3"),
                 get_links(sTicker=sTicker, moneycontrol_url=moneycontrol_url),
-                html.H4(f"Industry : {yt_asset_profile['industry']}"),
-                html.H4(f"Sector : {yt_asset_profile['sector']}"),
+                html.H4("Industry : " +
+                        f"{yt_asset_profile.get('industry', '--')}"),
+                html.H4(f"Sector : {yt_asset_profile.get('sector', '--')}"),
                 html.Hr(className="my-2"),
                 dbc.Row([
                     dbc.Col([
                         dbc.Row(html.Br()),
-                        get_ohlc_data(pricing=pricing),
+                        get_ohlc_data(pricing=pricing) if pricing
+                        else get_unavailable('Price'),
                         dbc.Row(html.Br()),
                         dbc.Row(dbc.Col(
                             dcc.Graph(figure=get_ytd_chart(
                                 yearly_pricing_data))
+                            if yearly_pricing_data is not None
+                            else get_unavailable('Price history')
                         )),
                         dbc.Row(html.Br()),
                         dbc.Row(get_ranges(pricing,
@@ -84,10 +101,13 @@ def display_value(n_clicks, symbol: str):
 
                     ]),
                     dbc.Col([
-                        dbc.Row(get_company_description(sTicker=sTicker)),
+                        dbc.Row(get_company_description(sTicker=sTicker)
+                                if sTicker
+                                else get_unavailable('Screener')),
                         dbc.Row(html.Br()),
                         dbc.Row(get_key_stats(
-                            key_stats, yTicker, ticker, pricing)),
+                            key_stats, data['summary_detail'] or {},
+                            pricing or {})),
                         dbc.Row(html.Br()),
                     ])
                 ])
@@ -95,12 +115,80 @@ def display_value(n_clicks, symbol: str):
             ], fluid=True
         )),
             dbc.Row(dbc.Container(html.Div(), style={'height': '3rem'})),
-            dbc.Row(dbc.Container(get_tables(sTicker), fluid=True,
+            dbc.Row(dbc.Container(get_tables(sTicker, data['peers'])
+                                  if sTicker
+                                  else get_unavailable('Screener'),
+                                  fluid=True,
                                   style={'height': '50rem'}))
         ])
 
 
-def get_tables(sTicker: STicker):
+def fetch_upstream(symbol):
+    from yahooquery import Ticker
+    ticker = symbol + ".NS"
+    yTicker = Ticker(ticker, timeout=YAHOO_TIMEOUT)
+    futures = {
+        'screener': submit_source('screener', STicker, symbol=symbol),
+        'history': submit_source(
+            'history', lambda: yTicker.history(
+                period='1y', interval='1d').loc[ticker].reset_index()),
+        'price': submit_source('price', lambda: yTicker.price[ticker]),
+        'asset_profile': submit_source(
+            'asset_profile', lambda: yTicker.asset_profile[ticker]),
+        'summary_detail': submit_source(
+            'summary_detail', lambda: yTicker.summary_detail[ticker]),
+        'moneycontrol': submit_source('moneycontrol', get_moneycontrol,
+                                      symbol=symbol),
+    }
+    start = time.monotonic()
+    sTicker = wait_source(symbol, 'screener', futures.pop('screener'), start)
+    if sTicker is not None:
+        # chained here rather than in the pool, so no worker ever blocks
+        # on another task
+        futures['peers'] = submit_source(
+            'peers', sTicker.get_industry_peer_comparison)
+    data = {'screener': sTicker, 'peers': None}
+    for source, future in futures.items():
+        data[source] = wait_source(symbol, source, future, start)
+    return data
+
+
+def wait_source(symbol, source, future, start):
+    # every source gets its own deadline, a late one is left out
+    remaining = start + UPSTREAM_TIMEOUTS[source] - time.monotonic()
+    try:
+        return future.result(timeout=max(0, remaining))
+    except TimeoutError:
+        # a task still queued behind busy workers is dropped
+        future.cancel()
+        print(f"Fetching {source} for {symbol} timed out")
+    except Exception as e:
+        print(f"Fetching {source} for {symbol} failed:", repr(e))
+    return None
+
+
+def submit_source(source, fn, *args, **kwargs):
+
+    def run():
+        # late sources are still timed after the page gave up on them
+        start, result = time.perf_counter(), 'error'
+        try:
+            value = fn(*args, **kwargs)
+            result = 'ok'
+            return value
+        finally:
+            metrics.source_duration.observe(time.perf_counter() - start,
+                                            source=source, result=result)
+
+    return upstream_pool.submit(run)
+
+
+def get_unavailable(name):
+    return dbc.Alert(f"{name} data is unavailable right now",
+                     color="warning")
+
+
+def get_tables(sTicker: STicker, peers: pd.DataFrame = None):
     return dbc.Tabs([
         dbc.Tab(dbc.Table.from_dataframe(sTicker.get_quarterly_results(
         ), striped=True, bordered=True, hover=True),
@@ -117,8 +205,9 @@ def get_tables(sTicker: STicker):
         dbc.Tab(dbc.Table.from_dataframe(sTicker.get_shareholder_pattern(
         ), striped=True, bordered=True, hover=True),
             label='Shareholder Pattern', labelClassName="text-info"),
-        dbc.Tab(dbc.Table.from_dataframe(sTicker.get_industry_peer_comparison(
-        ), striped=True, bordered=True, hover=True),
+        dbc.Tab(dbc.Table.from_dataframe(
+            peers, striped=True, bordered=True, hover=True)
+            if peers is not None else get_unavailable('Peer comparison'),
             label='Peer Comparison', labelClassName="text-success"),
     ])
 
@@ -126,19 +215,24 @@ def get_tables(sTicker: STicker):
 def get_links(sTicker: STicker, moneycontrol_url):
     return dbc.ButtonGroup([
         dbc.Button("Company", color="link",
-                   href=sTicker.get_company_link(),
+                   href=sTicker.get_company_link() if sTicker else None,
+                   disabled=sTicker is None,
                    external_link=True, className='fas fa-link'),
         dbc.Button("Screener", color="link",
-                   href=sTicker.get_screener_link(),
+                   href=sTicker.get_screener_link() if sTicker else None,
+                   disabled=sTicker is None,
                    external_link=True, className='fas fa-link'),
         dbc.Button("Moneycontrol", color="link",
                    href=moneycontrol_url,
+                   disabled=moneycontrol_url is None,
                    external_link=True, className='fas fa-link'),
         dbc.Button(["NSE"], color="link",
-                   href=sTicker.get_nse_link(),
+                   href=sTicker.get_nse_link() if sTicker else None,
+                   disabled=sTicker is None,
                    external_link=True, className='fas fa-link'),
         dbc.Button("BSE", color="link",
-                   href=sTicker.get_bse_link(),
+                   href=sTicker.get_bse_link() if sTicker else None,
+                   disabled=sTicker is None,
                    external_link=True, className='fas fa-link')
     ])
 
@@ -175,7 +269,10 @@ def get_ohlc_data(pricing):
     )
 
 
-def get_key_stats(key_stats, yTicker, ticker, pricing):
+def get_key_stats(key_stats, summary_detail, pricing):
+    # sources that did not arrive in time show up as --
+    fifty_day_average = summary_detail.get('fiftyDayAverage')
+    change_percent = pricing.get("regularMarketChangePercent")
     stats1 = pd.DataFrame(
         {
             "Stat": [
@@ -186,13 +283,12 @@ def get_key_stats(key_stats, yTicker, ticker, pricing):
                 "ROCE %"
             ],
             "Value": [
-                key_stats['Market Cap'],
-                round(yTicker.summary_detail
-                      [ticker]
-                      ['fiftyDayAverage'], 2),
-                pricing["regularMarketVolume"],
-                key_stats['High / Low'],
-                key_stats['ROCE']
+                key_stats.get('Market Cap', '--'),
+                round(fifty_day_average, 2)
+                if fifty_day_average is not None else '--',
+                pricing.get("regularMarketVolume", '--'),
+                key_stats.get('High / Low', '--'),
+                key_stats.get('ROCE', '--')
             ],
         }
     )
@@ -206,11 +302,12 @@ def get_key_stats(key_stats, yTicker, ticker, pricing):
                 "Percentage Change %"
             ],
             "Value": [
-                key_stats['Stock P/E'],
-                key_stats['Book Value'],
-                key_stats['Face Value'],
-                pricing['regularMarketPreviousClose'],
-                round(pricing["regularMarketChangePercent"]*100, 2)
+                key_stats.get('Stock P/E', '--'),
+                key_stats.get('Book Value', '--'),
+                key_stats.get('Face Value', '--'),
+                pricing.get('regularMarketPreviousClose', '--'),
+                round(change_percent*100, 2)
+                if change_percent is not None else '--'
             ],
         }
     )
@@ -255,6 +352,16 @@ def get_range(label, value, min_, max_):
 
 
 def get_ranges(pricing, moneycontrol_data):
+    if not pricing:
+        return [get_unavailable('Price range')]
+    if not moneycontrol_data:
+        return [dbc.Col(
+            dbc.Container(
+                get_range(label="Day",
+                          value=pricing['regularMarketPrice'],
+                          min_=pricing['regularMarketDayLow'],
+                          max_=pricing['regularMarketDayHigh'],
+                          )))]
     return [
         dbc.Col(
             dbc.Container(
@@ -284,24 +391,8 @@ def get_company_description(sTicker):
         color="dark", outline=True, inverse=True)
 
 
-def get_moneycontrol_url(symbol):
-    gen = search(f'{symbol} moneycontrol', tld='co.in',
-                 num=1, stop=1, pause=3)
-    return next(gen)
-
-
-def get_moneycontrol_data(link):
-    data = {}
-    soup = BeautifulSoup(requests.get(link).content, 'html.parser')
-    data['52_week_range'] = {}
-    data['52_week_range']['low'] = float(
-        soup.find('div', id='sp_yearlylow').string)
-    data['52_week_range']['high'] = float(
-        soup.find('div', id='sp_yearlyhigh').string)
-    return data
-
-
 def get_ytd_chart(pricing):
+    import plotly.express as px
     fig = px.line(pricing,
                   x='date', y='close')
     fig.update_xaxes(visible=True, fixedrange=True,
@@ -0,0 +1,120 @@
+import dash_html_components as html
+import dash_bootstrap_components as dbc
+import dash_table
+from dash.dependencies import Input, Output, State
+from dash.exceptions import PreventUpdate
+from app import app
+from settings import settings
+import pandas as pd
+
+PRELOAD = ('yahooquery',)
+BATCH_SIZE = 25
+
+layout = html.Div([
+    dbc.Row(
+        [
+            dbc.Form(
+                [
+                    dbc.FormGroup(
+                        [
+                            dbc.Input(
+                                type="text",
+                                placeholder="Enter comma separated symbols"
+                                + " or leave empty for the config.json"
+                                + " watchlist",
+                                id='watchlist-symbols-input',
+                                style={'width': '40rem'}),
+                        ], className="mr-3",
+                    ),
+                    dbc.Button(color="primary", id='watchlist-go-button',
+                               className='fas fa-sync-alt'),
+                ],
+                inline=True,
+            ),
+        ]
+    ),
+    dbc.Row(html.Br()),
+    dbc.Row(dbc.Spinner(dbc.Container(id='watchlist-output', fluid=True),
+                        type="grow"),
+            justify='center')
+])
+
+
+@app.callback(
+    Output('watchlist-output', 'children'),
+    [Input('watchlist-go-button', 'n_clicks')],
+    [State('watchlist-symbols-input', 'value')])
+def display_watchlist(n_clicks, symbols: str):
+    if n_clicks is None:
+        raise PreventUpdate
+    if symbols:
+        symbol_list = [symbol.upper().strip() for symbol in symbols.split(',')
+                       if symbol.strip()]
+    else:
+        symbol_list = settings.watchlist()
+    if not symbol_list:
+        raise PreventUpdate
+    summary = get_watchlist_summary(symbol_list)
+    return dash_table.DataTable(
+        columns=[{'name': column, 'id': column}
+                 for column in summary.columns],
+        data=summary.to_dict('records'),
+        sort_action='native',
+        style_header={'backgroundColor': '#303030',
+                      'fontWeight': 'bold'},
+        style_cell={'backgroundColor': '#222222',
+                    'color': '#FFFFFF',
+                    'textAlign': 'right'},
+        style_cell_conditional=[{'if': {'column_id': 'Symbol'},
+                                 'textAlign': 'left'}],
+    )
+
+
+def get_watchlist_summary(symbol_list: list) -> pd.DataFrame:
+    from yahooquery import Ticker
+    rows = []
+    for start in range(0, len(symbol_list), BATCH_SIZE):
+        batch = symbol_list[start:start + BATCH_SIZE]
+        tickers = [symbol + ".NS" for symbol in batch]
+        # one Ticker session per batch instead of one per symbol
+        yTicker = Ticker(tickers, asynchronous=True)
+        modules = yTicker.get_modules(['price', 'summaryDetail'])
+        history = yTicker.history(period='1y', interval='1d')
+        for symbol, ticker in zip(batch, tickers):
+            rows.append(get_watchlist_row(symbol, modules.get(ticker),
+                                          get_closes(history, ticker)))
+    return pd.DataFrame(rows)
+
+
+def get_closes(history, ticker):
+    # yahooquery returns a dict of errors instead of a frame when every
+    # symbol in the batch fails
+    if not isinstance(history, pd.DataFrame) or \
+            ticker not in history.index.get_level_values(0):
+        return None
+    return history.loc[ticker]['close']
+
+
+def get_watchlist_row(symbol, modules, closes):
+    if not isinstance(modules, dict):
+        modules = {}
+    pricing = modules.get('price', {})
+    summary_detail = modules.get('summaryDetail', {})
+    change_percent = pricing.get('regularMarketChangePercent')
+    return {
+        'Symbol': symbol,
+        'Price': pricing.get('regularMarketPrice'),
+        'Change %': round(change_percent * 100, 2)
+        if change_percent is not None else None,
+        'Day Low': pricing.get('regularMarketDayLow'),
+        'Day High': pricing.get('regularMarketDayHigh'),
+        '52W Low': summary_detail.get('fiftyTwoWeekLow'),
+        '52W High': summary_detail.get('fiftyTwoWeekHigh'),
+        '50 Day Average': round(summary_detail['fiftyDayAverage'], 2)
+        if summary_detail.get('fiftyDayAverage') is not None else None,
+        'Volume': pricing.get('regularMarketVolume'),
+        'P/E': round(summary_detail['trailingPE'], 2)
+        if summary_detail.get('trailingPE') is not None else None,
+        '1Y Return %': round((closes.iloc[-1] / closes.iloc[0] - 1) * 100, 2)
+        if closes is not None and len(closes) else None,
+    }
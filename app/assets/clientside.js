@@ -0,0 +1,58 @@
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    crypto_viewer: {
+        convert_from_eth: function(currency_input, amount_input, amount,
+                                   currency, current_price) {
+            if (amount === null || amount === undefined || !currency ||
+                !current_price) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            return Math.round(amount * current_price[currency] * 1000) / 1000;
+        },
+        convert_to_eth: function(currency_input, amount_input, amount,
+                                 currency, current_price) {
+            if (amount === null || amount === undefined || !currency ||
+                !current_price) {
+                throw window.dash_clientside.PreventUpdate;
+            }
+            return (amount / current_price[currency]).toFixed(7);
+        },
+        toggle_popover: function(n, is_open) {
+            return n ? !is_open : is_open;
+        },
+        toggle_collapse: function(n, is_open) {
+            return n ? !is_open : is_open;
+        },
+        toggle_modal: function(n1, n2, is_open) {
+            return (n1 || n2) ? !is_open : is_open;
+        }
+    },
+    crypto_rebalancer: {
+        form_feedback: function(symbols_input, ports_input, dp_input,
+                                rfr_input, symbols, ports, dp, rfr) {
+            var empty = function(value) {
+                return value === null || value === undefined || value === '';
+            };
+            var symbols_bool = empty(symbols);
+            var ports_bool = empty(ports) || ports <= 0;
+            var dp_bool = empty(dp) || dp <= 0;
+            var rfr_bool = empty(rfr);
+            var feedback_text = '';
+            if (symbols_bool) {
+                feedback_text += 'Symbols required!!';
+            }
+            if (ports_bool) {
+                feedback_text +=
+                    ' Number of portfolios has to be positive number!!';
+            }
+            if (dp_bool) {
+                feedback_text +=
+                    ' Number of data points has to be positive number!!';
+            }
+            if (rfr_bool) {
+                feedback_text += ' Risk free rate cannot be empty!!';
+            }
+            return [feedback_text, !symbols_bool, symbols_bool, !ports_bool,
+                    ports_bool, !dp_bool, dp_bool, !rfr_bool, rfr_bool];
+        }
+    }
+});
@@ -0,0 +1,47 @@
+import os
+from cache import CACHE_DIR, connect
+
+BAR_COLUMNS = ['time', 'open', 'high', 'low', 'close',
+               'volumefrom', 'volumeto']
+
+
+class BarStore:
+
+    def __init__(self, path=os.path.join(CACHE_DIR, 'bars.sqlite')):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect(self.path) as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS bars (
+                    symbol TEXT NOT NULL,
+                    to_symbol TEXT NOT NULL,
+                    frequency TEXT NOT NULL,
+                    exchange TEXT NOT NULL,
+                    time INTEGER NOT NULL,
+                    open REAL NOT NULL,
+                    high REAL NOT NULL,
+                    low REAL NOT NULL,
+                    close REAL NOT NULL,
+                    volumefrom REAL NOT NULL,
+                    volumeto REAL NOT NULL,
+                    PRIMARY KEY (symbol, to_symbol, frequency,
+                                 exchange, time)
+                ) WITHOUT ROWID''')
+
+    def load(self, key: tuple, since: int) -> list:
+        with connect(self.path) as connection:
+            rows = connection.execute(
+                f'SELECT {", ".join(BAR_COLUMNS)} FROM bars '
+                'WHERE symbol = ? AND to_symbol = ? AND frequency = ? '
+                'AND exchange = ? AND time >= ? ORDER BY time',
+                key + (since,)).fetchall()
+        return [dict(zip(BAR_COLUMNS, row)) for row in rows]
+
+    def save(self, key: tuple, bars: list):
+        with connect(self.path) as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO bars VALUES '
+                '(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                [key + tuple(bar[column] for column in BAR_COLUMNS)
+                 for bar in bars])
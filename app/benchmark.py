@@ -0,0 +1,413 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from functools import lru_cache
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+import plotly
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import BaseAdapter
+from http_client import HttpClient, http, get_coingecko
+from settings import settings
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURES_DIR = os.path.join(APP_DIR, 'benchmark_fixtures')
+OUTPUT = 'benchmark.json'
+REPEAT = 20
+REGRESSION_THRESHOLD = 1.25
+RECORD_SYMBOL = 'TCS'
+RECORD_COIN = 'bitcoin'
+MONEYCONTROL_URL = 'https://www.moneycontrol.com/india/stockpricequote/' \
+    'computers-software/tataconsultancyservices/TCS'
+CRYPTO_DATA_POINTS = [365, 2000]
+ASSET_COUNTS = [5, 20]
+PORTFOLIO_SIZES = [10000, 100000]
+SCREENER_GETTERS = [
+    'get_company_name', 'get_company_description', 'get_company_link',
+    'get_bse_link', 'get_nse_link', 'get_industry', 'get_sector',
+    'get_key_stats', 'get_pros_and_cons', 'get_quarterly_results',
+    'get_profit_and_loss', 'get_balance_sheet', 'get_cash_flow',
+    'get_ratios', 'get_shareholder_pattern', 'get_compounded_sales_growth',
+    'get_compounded_profit_growth', 'get_stock_price_cagr',
+    'get_return_on_equity', 'get_industry_peer_comparison',
+]
+
+
+@lru_cache(maxsize=None)
+def load_fixture(name) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, name), 'rb') as file:
+        return file.read()
+
+
+def get_histo_fixture(request) -> bytes:
+    # recorded bars are moved so that the last one is the current bar
+    data = json.loads(load_fixture('cryptocompare_histoday.json'))
+    limit = int(parse_qs(urlparse(request.url).query)['limit'][0])
+    bars = data['Data']['Data'][-(limit + 1):]
+    now = int(time.time())
+    shift = now - now % 86400 - bars[-1]['time']
+    data['Data']['Data'] = [dict(bar, time=bar['time'] + shift)
+                            for bar in bars]
+    return json.dumps(data).encode()
+
+
+def get_markets_fixture(request) -> bytes:
+    page = parse_qs(urlparse(request.url).query).get('page', ['1'])[0]
+    return load_fixture('coingecko_coins_markets.json') if page == '1' \
+        else b'[]'
+
+
+# first matching host and path prefix answers the request
+ROUTES = [
+    ('www.screener.in', '/company/compare/', 'screener_peers.html'),
+    ('www.screener.in', '/company/', 'screener_company.html'),
+    ('www.moneycontrol.com', '/india/stockpricequote/',
+     'moneycontrol_page.html'),
+    ('min-api.cryptocompare.com', '/data/v2/histo', get_histo_fixture),
+    ('api.coingecko.com', '/api/v3/coins/list', 'coingecko_coins_list.json'),
+    ('api.coingecko.com', '/api/v3/coins/markets', get_markets_fixture),
+    ('api.coingecko.com', f'/api/v3/coins/{RECORD_COIN}/tickers',
+     'coingecko_tickers.json'),
+    ('api.coingecko.com', f'/api/v3/coins/{RECORD_COIN}/',
+     'coingecko_coin.json'),
+]
+
+
+class FixtureAdapter(BaseAdapter):
+
+    def send(self, request, **kwargs):
+        url = urlparse(request.url)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.encoding = 'utf-8'
+        response.status_code = 404
+        response._content = b''
+        for host, prefix, fixture in ROUTES:
+            if url.hostname == host and url.path.startswith(prefix):
+                response.status_code = 200
+                response._content = fixture(request) if callable(fixture) \
+                    else load_fixture(fixture)
+                break
+        return response
+
+    def close(self):
+        pass
+
+
+class TickerStandIn:
+    # the yahooquery calls Stock Viewer makes, answered from the fixtures
+
+    def __init__(self, symbols, **kwargs):
+        self.symbols = symbols
+        quote = json.loads(load_fixture('yahoo_quote.json'))
+        self.price = {symbols: quote['price']}
+        self.asset_profile = {symbols: quote['asset_profile']}
+        self.summary_detail = {symbols: quote['summary_detail']}
+
+    def history(self, period='1y', interval='1d') -> pd.DataFrame:
+        bars = pd.DataFrame(json.loads(load_fixture('yahoo_history.json')))
+        bars['date'] = pd.to_datetime(bars['date'])
+        bars['symbol'] = self.symbols
+        return bars.set_index(['symbol', 'date'])
+
+
+def search_stand_in(query, **kwargs):
+    yield MONEYCONTROL_URL
+
+
+def install_stand_in(tmp_dir):
+    # upstream calls are answered from the fixtures and every cache the
+    # benchmarks touch lives in a throwaway directory
+    import yahooquery
+    import ScreenerTicker
+    import moneycontrol
+    from cache import DiskCache
+    from bar_store import BarStore
+    from apps import crypto_rebalancer
+    client = HttpClient(rate_limits={}, retries=0)
+    client.mount('https://', FixtureAdapter())
+    client.mount('http://', FixtureAdapter())
+    ScreenerTicker.http = client
+    moneycontrol.http = client
+    crypto_rebalancer.http = client
+    get_coingecko().session = client
+    yahooquery.Ticker = TickerStandIn
+    moneycontrol.get_search = lambda: search_stand_in
+    cache_path = os.path.join(tmp_dir, 'cache.sqlite')
+    ScreenerTicker.page_disk = DiskCache('screener_pages', path=cache_path)
+    moneycontrol.moneycontrol_urls = DiskCache(
+        'moneycontrol_urls', ttl=None, path=cache_path)
+    moneycontrol.failed_lookups = DiskCache(
+        'moneycontrol_failed_lookups', ttl=moneycontrol.FAILED_LOOKUP_TTL,
+        path=cache_path)
+    crypto_rebalancer.bar_store = BarStore(
+        path=os.path.join(tmp_dir, 'bars.sqlite'))
+
+
+def measure(name, fn, repeat, setup=None, **params) -> dict:
+    # one untimed run warms imports, pools and caches
+    if setup is not None:
+        setup()
+    fn()
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    result = {
+        'name': name,
+        'params': params,
+        'repeat': repeat,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if repeat > 1 else 0.0,
+    }
+    print(f"{get_key(result):<70} {result['median'] * 1000:>10.3f} ms")
+    return result
+
+
+def get_key(result) -> str:
+    params = ','.join(f'{key}={value}'
+                      for key, value in sorted(result['params'].items()))
+    return f"{result['name']}[{params}]" if params else result['name']
+
+
+def benchmark_screener(repeat, tmp_dir) -> list:
+    import ScreenerTicker
+    from ScreenerTicker import STicker
+    link = STicker(RECORD_SYMBOL).get_screener_link()
+
+    def cold():
+        ScreenerTicker.page_memory.clear()
+        ScreenerTicker.page_disk.pop(link)
+
+    results = [
+        measure('screener.sticker_cold', lambda: STicker(RECORD_SYMBOL),
+                repeat, setup=cold),
+        measure('screener.sticker_disk', lambda: STicker(RECORD_SYMBOL),
+                repeat, setup=ScreenerTicker.page_memory.clear),
+        measure('screener.sticker_warm', lambda: STicker(RECORD_SYMBOL),
+                repeat),
+    ]
+    sTicker = STicker(RECORD_SYMBOL)
+    for getter in SCREENER_GETTERS:
+        setup = ScreenerTicker.peers_memory.clear \
+            if getter == 'get_industry_peer_comparison' else None
+        results.append(measure(f'screener.{getter}',
+                               getattr(sTicker, getter), repeat, setup=setup))
+    return results
+
+
+def benchmark_crypto_data(repeat, tmp_dir) -> list:
+    from bar_store import BarStore
+    from apps import crypto_rebalancer
+    counter = itertools.count()
+
+    def cold():
+        crypto_rebalancer.bar_store = BarStore(path=os.path.join(
+            tmp_dir, f'bars-{next(counter)}.sqlite'))
+
+    results = []
+    for points in CRYPTO_DATA_POINTS:
+        def fetch():
+            return crypto_rebalancer.get_crypto_data(
+                'BTC', 'benchmark', exchange=None, no_of_data_points=points)
+        results.append(measure('crypto.get_crypto_data_cold', fetch, repeat,
+                               setup=cold, no_of_data_points=points))
+        results.append(measure('crypto.get_crypto_data_warm', fetch, repeat,
+                               no_of_data_points=points))
+    return results
+
+
+def benchmark_optimizer(repeat, tmp_dir) -> list:
+    from apps.crypto_rebalancer import fetch_expected_weights
+    results = []
+    for assets in ASSET_COUNTS:
+        prices = get_prices(assets)
+        for num_portfolios in PORTFOLIO_SIZES:
+            results.append(measure(
+                'optimizer.fetch_expected_weights',
+                lambda: fetch_expected_weights(
+                    list(prices.columns), prices,
+                    num_portfolios=num_portfolios, seed=0),
+                repeat, assets=assets, num_portfolios=num_portfolios))
+    return results
+
+
+def get_prices(assets, days=366) -> pd.DataFrame:
+    rng = np.random.default_rng(assets)
+    returns = rng.normal(0.001, 0.04, size=(days, assets))
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)),
+                        columns=[f'C{i}' for i in range(assets)])
+
+
+def benchmark_crypto_viewer(repeat, tmp_dir) -> list:
+    from apps import crypto_viewer
+    coin = json.loads(load_fixture('coingecko_coin.json'))
+
+    def display_value():
+        # serialized the way Dash sends it to the browser
+        return json.dumps(crypto_viewer.display_value.__wrapped__(1, 'BTC'),
+                          cls=plotly.utils.PlotlyJSONEncoder)
+
+    return [
+        measure('crypto_viewer.get_market_data',
+                lambda: crypto_viewer.get_market_data(data=coin), repeat),
+        measure('crypto_viewer.display_value', display_value, repeat),
+    ]
+
+
+def benchmark_stock_viewer(repeat, tmp_dir) -> list:
+    from apps import stock_viewer
+
+    def display_value():
+        return json.dumps(
+            stock_viewer.display_value.__wrapped__(1, RECORD_SYMBOL),
+            cls=plotly.utils.PlotlyJSONEncoder)
+
+    return [
+        measure('stock_viewer.fetch_upstream',
+                lambda: stock_viewer.fetch_upstream(RECORD_SYMBOL), repeat),
+        measure('stock_viewer.display_value', display_value, repeat),
+    ]
+
+
+BENCHMARKS = {
+    'screener': benchmark_screener,
+    'stock_viewer': benchmark_stock_viewer,
+    'crypto_data': benchmark_crypto_data,
+    'optimizer': benchmark_optimizer,
+    'crypto_viewer': benchmark_crypto_viewer,
+}
+
+
+def get_environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR,
+            capture_output=True, text=True).stdout.strip() or None
+    except(OSError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'timestamp': time.time(),
+    }
+
+
+def compare(results, baseline_path, threshold) -> list:
+    with open(baseline_path) as file:
+        baseline = {get_key(result): result
+                    for result in json.load(file)['results']}
+    regressions = []
+    for result in results:
+        previous = baseline.get(get_key(result))
+        if previous is None:
+            continue
+        ratio = result['median'] / previous['median']
+        if ratio > threshold:
+            regressions.append(get_key(result))
+        print(f'{get_key(result):<70} {ratio:>9.2f}x' +
+              (' REGRESSION' if ratio > threshold else ''))
+    return regressions
+
+
+def record():
+    # refreshes the fixtures from the live upstreams
+    fixtures = {}
+    company_link = \
+        f'https://www.screener.in/company/{RECORD_SYMBOL}/consolidated/'
+    fixtures['screener_company.html'] = http.get(company_link).content
+    soup = BeautifulSoup(fixtures['screener_company.html'], 'html.parser')
+    fixtures['screener_peers.html'] = http.get(
+        'https://www.screener.in' + soup.find('section', id='peers')
+        .find_next('a').find_next('a').get('href')).content
+    fixtures['cryptocompare_histoday.json'] = http.get(
+        'https://min-api.cryptocompare.com/data/v2/histoday',
+        params={'fsym': 'BTC', 'tsym': 'USD', 'limit': 2000,
+                'api_key': settings.crypto_compare_api_key()}).content
+    coingecko_url = 'https://api.coingecko.com/api/v3/'
+    fixtures['coingecko_coin.json'] = http.get(
+        f'{coingecko_url}coins/{RECORD_COIN}/',
+        params={'localization': 'false', 'tickers': 'false',
+                'community_data': 'false',
+                'developer_data': 'false'}).content
+    fixtures['coingecko_tickers.json'] = http.get(
+        f'{coingecko_url}coins/{RECORD_COIN}/tickers',
+        params={'page': 1, 'order': 'volume_desc'}).content
+    fixtures['coingecko_coins_list.json'] = http.get(
+        f'{coingecko_url}coins/list').content
+    fixtures['coingecko_coins_markets.json'] = http.get(
+        f'{coingecko_url}coins/markets',
+        params={'vs_currency': 'usd', 'order': 'market_cap_desc',
+                'per_page': 250, 'page': 1}).content
+    from yahooquery import Ticker
+    from moneycontrol import search_moneycontrol_url
+    ticker = RECORD_SYMBOL + '.NS'
+    yTicker = Ticker(ticker)
+    fixtures['yahoo_quote.json'] = json.dumps({
+        'price': yTicker.price[ticker],
+        'asset_profile': yTicker.asset_profile[ticker],
+        'summary_detail': yTicker.summary_detail[ticker]},
+        default=str).encode()
+    fixtures['yahoo_history.json'] = yTicker.history(
+        period='1y', interval='1d').loc[ticker].reset_index().to_json(
+        orient='records', date_format='iso').encode()
+    fixtures['moneycontrol_page.html'] = http.get(
+        search_moneycontrol_url(RECORD_SYMBOL)).content
+    for name, content in fixtures.items():
+        with open(os.path.join(FIXTURES_DIR, name), 'wb') as file:
+            file.write(content)
+        print(f'Recorded {name} ({len(content):,} bytes)')
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Time the hot paths against recorded upstream fixtures')
+    parser.add_argument('--output', default=OUTPUT)
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--only', action='append', choices=BENCHMARKS,
+                        help='run only these groups, can be repeated')
+    parser.add_argument('--baseline',
+                        help='earlier output to compare the medians with')
+    parser.add_argument('--threshold', type=float,
+                        default=REGRESSION_THRESHOLD)
+    parser.add_argument('--record', action='store_true',
+                        help='refresh the fixtures from the live upstreams')
+    args = parser.parse_args(argv)
+    if args.record:
+        record()
+        return 0
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        install_stand_in(tmp_dir)
+        for name in args.only or BENCHMARKS:
+            results += BENCHMARKS[name](args.repeat, tmp_dir)
+    with open(args.output, 'w') as file:
+        json.dump({'environment': get_environment(), 'results': results},
+                  file, indent=4)
+    print(f'Wrote {len(results)} results to {args.output}')
+    if args.baseline and compare(results, args.baseline, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
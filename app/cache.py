@@ -0,0 +1,125 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import metrics
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache')
+
+
+@contextmanager
+def connect(path):
+    # one short lived connection per call keeps sqlite thread safe
+    connection = sqlite3.connect(path, timeout=30)
+    try:
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
+class TTLCache:
+
+    def __init__(self, maxsize=128, ttl=3600, name='memory'):
+        # least recently used entries are evicted once maxsize is reached
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key, max_age=None):
+        max_age = self.ttl if max_age is None else max_age
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                metrics.cache_requests.inc(cache=self.name, result='miss')
+                return None
+            value, stored_at = entry
+            if time.time() - stored_at > max_age:
+                if time.time() - stored_at > self.ttl:
+                    del self.__entries[key]
+                metrics.cache_requests.inc(cache=self.name, result='miss')
+                return None
+            self.__entries.move_to_end(key)
+        metrics.cache_requests.inc(cache=self.name, result='hit')
+        return value
+
+    def set(self, key, value, stored_at=None):
+        with self.__lock:
+            self.__entries[key] = (value, stored_at or time.time())
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+
+    def pop(self, key):
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+        return None if entry is None else entry[0]
+
+    def clear(self):
+        with self.__lock:
+            self.__entries.clear()
+
+
+class DiskCache:
+
+    def __init__(self, namespace, ttl=86400,
+                 path=os.path.join(CACHE_DIR, 'cache.sqlite')):
+        self.namespace = namespace
+        # a callable ttl is read again on every use
+        self.ttl = ttl
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with connect(self.path) as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value BLOB NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                ) WITHOUT ROWID''')
+
+    def get_ttl(self):
+        return self.ttl() if callable(self.ttl) else self.ttl
+
+    def get(self, key, max_age=None):
+        max_age = self.get_ttl() if max_age is None else max_age
+        # entries never expire when there is no ttl
+        oldest = 0 if max_age is None else time.time() - max_age
+        with connect(self.path) as connection:
+            row = connection.execute(
+                'SELECT value FROM entries WHERE namespace = ? AND key = ? '
+                'AND stored_at >= ?',
+                (self.namespace, key, oldest)).fetchone()
+        metrics.cache_requests.inc(cache=self.namespace,
+                                   result='miss' if row is None else 'hit')
+        return None if row is None else pickle.loads(row[0])
+
+    def set(self, key, value, stored_at=None):
+        self.set_many({key: value}, stored_at=stored_at)
+
+    def set_many(self, items: dict, stored_at=None):
+        stored_at = stored_at or time.time()
+        ttl = self.get_ttl()
+        with connect(self.path) as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)',
+                [(self.namespace, key, pickle.dumps(value), stored_at)
+                 for key, value in items.items()])
+            if ttl is not None:
+                connection.execute(
+                    'DELETE FROM entries '
+                    'WHERE namespace = ? AND stored_at < ?',
+                    (self.namespace, time.time() - ttl))
+
+    def pop(self, key):
+        with connect(self.path) as connection:
+            connection.execute(
+                'DELETE FROM entries WHERE namespace = ? AND key = ?',
+                (self.namespace, key))
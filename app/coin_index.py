@@ -0,0 +1,69 @@
+import threading
+import time
+from http_client import get_coingecko
+
+COIN_LIST_TTL = 6 * 60 * 60
+RANKED_PAGES = 4
+
+
+class CoinIndex:
+
+    def __init__(self, ttl=COIN_LIST_TTL):
+        self.ttl = ttl
+        self.__symbols = {}
+        self.__slugs = {}
+        self.__loaded_at = None
+        self.__refreshing = False
+        self.__lock = threading.Lock()
+
+    def resolve(self, value: str):
+        self.__ensure_fresh()
+        ids = self.__symbols.get(value.upper())
+        if ids:
+            return ids[0]
+        return self.__slugs.get(value.lower())
+
+    def __ensure_fresh(self):
+        if self.__loaded_at is None:
+            with self.__lock:
+                if self.__loaded_at is None:
+                    self.__refresh()
+        elif time.monotonic() - self.__loaded_at > self.ttl:
+            # serve the stale index while a single thread reloads it
+            with self.__lock:
+                if self.__refreshing:
+                    return
+                self.__refreshing = True
+            threading.Thread(target=self.__background_refresh,
+                             daemon=True).start()
+
+    def __background_refresh(self):
+        try:
+            self.__refresh()
+        except Exception as e:
+            print("Coin list refresh failed:", e)
+        finally:
+            self.__refreshing = False
+
+    def __refresh(self):
+        coingecko = get_coingecko()
+        coins = coingecko.get_coins_list()
+        ranks = {}
+        for page in range(1, RANKED_PAGES + 1):
+            for coin in coingecko.get_coins_markets(
+                    vs_currency='usd', order='market_cap_desc',
+                    per_page=250, page=page):
+                if coin.get('market_cap_rank') is not None:
+                    ranks[coin['id']] = coin['market_cap_rank']
+        symbols = {}
+        for coin in coins:
+            symbols.setdefault(coin['symbol'].upper(), []).append(coin['id'])
+        # ranked coins win a shared symbol, the rest fall back to id order
+        for ids in symbols.values():
+            ids.sort(key=lambda id_: (ranks.get(id_, float('inf')), id_))
+        self.__symbols = symbols
+        self.__slugs = {coin['id'].lower(): coin['id'] for coin in coins}
+        self.__loaded_at = time.monotonic()
+
+
+coin_index = CoinIndex()
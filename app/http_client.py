@@ -0,0 +1,99 @@
+import functools
+import random
+import time
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from ratelimit import RateLimiter
+import metrics
+
+# connect and read timeouts in seconds
+TIMEOUT = (5, 30)
+RETRIES = 3
+BACKOFF = 0.5
+MAX_BACKOFF = 30
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+POOL_SIZE = 16
+
+# requests per second and burst size per upstream host
+RATE_LIMITS = {
+    'api.coingecko.com': (0.5, 10),
+    'min-api.cryptocompare.com': (20, 20),
+    'www.screener.in': (1, 5),
+    'www.moneycontrol.com': (1, 5),
+}
+
+
+class HttpClient(requests.Session):
+
+    def __init__(self, rate_limits=RATE_LIMITS, retries=RETRIES,
+                 backoff=BACKOFF, timeout=TIMEOUT):
+        super().__init__()
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.__limiters = {host: RateLimiter(rate, capacity)
+                           for host, (rate, capacity) in rate_limits.items()}
+        # keep-alive connections are pooled per host and shared by threads
+        adapter = HTTPAdapter(pool_connections=len(rate_limits) + 4,
+                              pool_maxsize=POOL_SIZE)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        host = urlparse(url).hostname
+        limiter = self.__limiters.get(host)
+        retries = self.retries if method.upper() in RETRY_METHODS else 0
+        for attempt in range(retries + 1):
+            if limiter is not None:
+                limiter.acquire()
+            try:
+                response = self.__send(host, method, url, **kwargs)
+            except(requests.ConnectionError, requests.Timeout):
+                if attempt == retries:
+                    raise
+                time.sleep(self.__get_delay(attempt))
+                continue
+            if response.status_code not in RETRY_STATUSES or \
+                    attempt == retries:
+                return response
+            delay = self.__get_delay(attempt, response)
+            response.close()
+            time.sleep(delay)
+
+    def __send(self, host, method, url, **kwargs):
+        status = 'error'
+        try:
+            with metrics.upstream_in_flight.track_in_progress(host=host), \
+                    metrics.upstream_duration.time(host=host):
+                response = super().request(method, url, **kwargs)
+            status = response.status_code
+            return response
+        finally:
+            metrics.upstream_requests.inc(host=host, status=status)
+
+    def __get_delay(self, attempt, response=None):
+        # full jitter keeps concurrent callers from retrying in lockstep
+        delay = random.uniform(0, self.backoff * 2 ** attempt)
+        retry_after = None if response is None else \
+            response.headers.get('Retry-After')
+        if retry_after is not None and retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+        return min(delay, MAX_BACKOFF)
+
+
+http = HttpClient()
+
+
+@functools.lru_cache(maxsize=None)
+def get_coingecko():
+    # pycoingecko is only imported once a page asks CoinGecko for data
+    from pycoingecko import CoinGeckoAPI
+    # it sends every call through its session attribute
+    coingecko = CoinGeckoAPI()
+    coingecko.session = http
+    coingecko.request_timeout = TIMEOUT
+    return coingecko
@@ -1,11 +1,22 @@
-import dash_core_components as dcc
-import dash_html_components as html
-from dash.dependencies import Input, Output
-import dash_bootstrap_components as dbc
+from startup import StartupTimer
 
-from app import app
-from apps import stock_viewer, crypto_viewer
-from apps import crypto_rebalancer
+startup_timer = StartupTimer()
+with startup_timer.phase('app'):
+    import dash_core_components as dcc
+    import dash_html_components as html
+    from dash.dependencies import Input, Output
+    import dash_bootstrap_components as dbc
+    from app import app
+# callbacks and component libraries are registered before the first page
+# is served, the heavy dependencies of each page load on first use
+with startup_timer.phase('stock_viewer'):
+    from apps import stock_viewer
+with startup_timer.phase('crypto_viewer'):
+    from apps import crypto_viewer
+with startup_timer.phase('crypto_rebalancer'):
+    from apps import crypto_rebalancer
+with startup_timer.phase('watchlist'):
+    from apps import watchlist
 
 
 server = app.server
@@ -25,6 +36,13 @@ navbar = dbc.Navbar([
         ], navbar=True),
         sm=3, md=2, lg=1
     ),
+    dbc.Col(
+        dbc.Nav([
+            dbc.NavItem(dbc.NavLink("Watchlist",
+                                    href="/apps/watchlist"))
+        ], navbar=True),
+        sm=3, md=2, lg=1
+    ),
     dbc.Col(
         dbc.Nav([
             dbc.NavItem(dbc.NavLink("Crypto Viewer",
@@ -53,18 +71,20 @@ content = html.Div(id="page-content", style=CONTENT_STYLE)
 
 app.layout = html.Div([dcc.Location(id="url"), navbar, content])
 
+pages = {
+    '/': stock_viewer,
+    '/apps/stock_viewer': stock_viewer,
+    '/apps/watchlist': watchlist,
+    '/apps/crypto_viewer': crypto_viewer,
+    '/apps/crypto_rebalancer': crypto_rebalancer,
+    # '/apps/test': test,
+}
+
 @app.callback(Output('page-content', 'children'),
               Input('url', 'pathname'))
 def display_page(pathname):
-    if pathname in ['/', '/apps/stock_viewer']:
-        return stock_viewer.layout
-    elif pathname == '/apps/crypto_viewer':
-        return crypto_viewer.layout
-    elif pathname == '/apps/crypto_rebalancer':
-        return crypto_rebalancer.layout
-    # elif pathname == '/apps/test':
-    #     return test.layout
-    else:
+    page = pages.get(pathname)
+    if page is None:
         return dbc.Jumbotron(
             [
                 html.H1("404: Not found", className="text-danger"),
@@ -72,7 +92,11 @@ def display_page(pathname):
                 html.P(f"The pathname {pathname} was not recognised..."),
             ]
         )
+    startup_timer.preload(*page.PRELOAD)
+    return page.layout
+
 
+print(startup_timer.report())
 
 if __name__ == '__main__':
     app.run_server(debug=True)
@@ -0,0 +1,104 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_TTL = 10 * 60
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.finished_at = None
+        self.__cancel = threading.Event()
+        self.__stop = threading.Event()
+
+    def cancel(self):
+        self.__cancel.set()
+
+    def is_cancelled(self) -> bool:
+        return self.__cancel.is_set()
+
+    def stop(self):
+        # unlike cancel, the job decides how to wrap up with what it has
+        self.__stop.set()
+
+    def is_stopped(self) -> bool:
+        return self.__stop.is_set()
+
+    def report(self, **progress):
+        # long running work reports here, which is also where it stops
+        # once the job is cancelled
+        if self.is_cancelled():
+            raise JobCancelled()
+        self.progress = dict(self.progress, **progress)
+
+
+class JobRunner:
+
+    def __init__(self, max_workers=2):
+        self.__pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.__jobs = {}
+        self.__lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs) -> str:
+        job = Job()
+        with self.__lock:
+            self.__expire()
+            self.__jobs[job.id] = job
+        self.__pool.submit(self.__run, job, fn, *args, **kwargs)
+        return job.id
+
+    def get(self, job_id) -> Job:
+        with self.__lock:
+            return self.__jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def stop(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.stop()
+
+    def __run(self, job, fn, *args, **kwargs):
+        try:
+            if job.is_cancelled():
+                raise JobCancelled()
+            job.status = RUNNING
+            job.result = fn(job, *args, **kwargs)
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = e
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def __expire(self):
+        now = time.time()
+        for job_id in [job_id for job_id, job in self.__jobs.items()
+                       if job.finished_at is not None and
+                       now - job.finished_at > JOB_TTL]:
+            del self.__jobs[job_id]
+
+
+jobs = JobRunner()
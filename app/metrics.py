@@ -0,0 +1,202 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+import flask
+
+# seconds, from a fast cache hit up to a slow optimization
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+registry = []
+
+
+def get_label_values(names, labels) -> tuple:
+    return tuple(str(labels[name]) for name in names)
+
+
+def format_labels(names, values, extra=()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        '{0}="{1}"'.format(name, value.replace('\\', '\\\\')
+                           .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs) + '}'
+
+
+class Counter:
+
+    type = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.__values = {}
+        self.__lock = threading.Lock()
+        registry.append(self)
+
+    def inc(self, amount=1, **labels):
+        key = get_label_values(self.labels, labels)
+        with self.__lock:
+            self.__values[key] = self.__values.get(key, 0) + amount
+
+    def samples(self) -> list:
+        with self.__lock:
+            values = list(self.__values.items())
+        return [(self.name + format_labels(self.labels, key), value)
+                for key, value in values]
+
+
+class Gauge:
+
+    type = 'gauge'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.__values = {}
+        self.__lock = threading.Lock()
+        registry.append(self)
+
+    def set(self, value, **labels):
+        key = get_label_values(self.labels, labels)
+        with self.__lock:
+            self.__values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = get_label_values(self.labels, labels)
+        with self.__lock:
+            self.__values[key] = self.__values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_in_progress(self, **labels):
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self) -> list:
+        with self.__lock:
+            values = list(self.__values.items())
+        return [(self.name + format_labels(self.labels, key), value)
+                for key, value in values]
+
+
+class Histogram:
+
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # per label values: a count per bucket plus +Inf, then the sum
+        self.__values = {}
+        self.__lock = threading.Lock()
+        registry.append(self)
+
+    def observe(self, value, **labels):
+        key = get_label_values(self.labels, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.__lock:
+            counts = self.__values.get(key)
+            if counts is None:
+                counts = self.__values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> list:
+        with self.__lock:
+            values = [(key, list(counts))
+                      for key, counts in self.__values.items()]
+        samples = []
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts[:-1]):
+                cumulative += count
+                samples.append((self.name + '_bucket' + format_labels(
+                    self.labels, key, [('le', str(bound))]), cumulative))
+            samples.append((self.name + '_sum' +
+                            format_labels(self.labels, key), counts[-1]))
+            samples.append((self.name + '_count' +
+                            format_labels(self.labels, key), cumulative))
+        return samples
+
+
+callback_duration = Histogram(
+    'dash_callback_duration_seconds', 'Dash callback latency',
+    ['callback'])
+callbacks_in_flight = Gauge(
+    'dash_callbacks_in_flight', 'Dash callbacks being served')
+upstream_duration = Histogram(
+    'upstream_request_duration_seconds',
+    'Upstream HTTP latency per attempt', ['host'])
+upstream_requests = Counter(
+    'upstream_requests_total', 'Upstream HTTP attempts',
+    ['host', 'status'])
+upstream_in_flight = Gauge(
+    'upstream_requests_in_flight', 'Upstream HTTP requests being sent',
+    ['host'])
+source_duration = Histogram(
+    'stock_source_duration_seconds',
+    'Stock viewer latency per upstream source', ['source', 'result'])
+cache_requests = Counter(
+    'cache_requests_total', 'Cache lookups', ['cache', 'result'])
+optimizer_portfolios = Counter(
+    'optimizer_portfolios_total', 'Portfolios evaluated by Monte Carlo')
+optimizer_seconds = Counter(
+    'optimizer_seconds_total', 'Time spent sampling portfolios')
+optimizer_throughput = Gauge(
+    'optimizer_portfolios_per_second',
+    'Portfolios per second of the last Monte Carlo run')
+startup_seconds = Gauge(
+    'app_startup_seconds',
+    'Time spent importing each part of the app', ['phase'])
+
+
+def render() -> str:
+    lines = []
+    for metric in registry:
+        lines.append(f'# HELP {metric.name} {metric.help}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        lines += [f'{name} {value}' for name, value in metric.samples()]
+    return '\n'.join(lines) + '\n'
+
+
+def install(server):
+    @server.before_request
+    def start_callback_timer():
+        if flask.request.path.endswith('/_dash-update-component'):
+            # dash parses the same cached body again
+            body = flask.request.get_json(silent=True) or {}
+            flask.g.metrics_callback = body.get('output', 'unknown')
+            flask.g.metrics_started = time.perf_counter()
+            callbacks_in_flight.inc()
+
+    @server.teardown_request
+    def stop_callback_timer(exception=None):
+        started = flask.g.pop('metrics_started', None)
+        if started is not None:
+            callbacks_in_flight.dec()
+            callback_duration.observe(time.perf_counter() - started,
+                                      callback=flask.g.metrics_callback)
+
+    @server.route('/metrics')
+    def metrics():
+        return flask.Response(render(),
+                              mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,80 @@
+import csv
+import functools
+import sys
+from urllib.request import urlopen
+from cache import DiskCache
+from http_client import http
+
+SEARCH_TIMEOUT = 10
+FAILED_LOOKUP_TTL = 24 * 60 * 60
+
+# symbol -> moneycontrol url, kept until the page stops working
+moneycontrol_urls = DiskCache('moneycontrol_urls', ttl=None)
+# symbol -> searched url without a 52 week range, empty when none was found
+failed_lookups = DiskCache('moneycontrol_failed_lookups',
+                           ttl=FAILED_LOOKUP_TTL)
+
+
+@functools.lru_cache(maxsize=None)
+def get_search():
+    import googlesearch
+    # googlesearch opens its pages without a timeout, a hung search would
+    # hold its worker for as long as the connection stays open
+    googlesearch.urlopen = functools.partial(urlopen, timeout=SEARCH_TIMEOUT)
+    return googlesearch.search
+
+
+def search_moneycontrol_url(symbol):
+    gen = get_search()(f'{symbol} moneycontrol', tld='co.in',
+                       num=1, stop=1, pause=3)
+    return next(gen, None)
+
+
+def get_moneycontrol_data(link):
+    from bs4 import BeautifulSoup
+    data = {}
+    soup = BeautifulSoup(http.get(link).content, 'html.parser')
+    data['52_week_range'] = {}
+    data['52_week_range']['low'] = float(
+        soup.find('div', id='sp_yearlylow').string)
+    data['52_week_range']['high'] = float(
+        soup.find('div', id='sp_yearlyhigh').string)
+    return data
+
+
+def get_moneycontrol(symbol):
+    url = moneycontrol_urls.get(symbol)
+    if url is not None:
+        try:
+            return url, get_moneycontrol_data(url)
+        except(AttributeError, TypeError, ValueError):
+            # the stored page no longer has a 52 week range, search again
+            moneycontrol_urls.pop(symbol)
+    failed_url = failed_lookups.get(symbol)
+    if failed_url is not None:
+        return failed_url or None, None
+    url = search_moneycontrol_url(symbol)
+    try:
+        if url is None:
+            raise ValueError('no search result')
+        data = get_moneycontrol_data(url)
+    except(AttributeError, TypeError, ValueError):
+        # searching again right away finds the same page
+        failed_lookups.set(symbol, url or '')
+        return url, None
+    moneycontrol_urls.set(symbol, url)
+    return url, data
+
+
+def import_moneycontrol_urls(path):
+    # csv with symbol and url columns
+    with open(path, newline='') as file:
+        urls = {row['symbol'].upper().strip(): row['url'].strip()
+                for row in csv.DictReader(file)}
+    moneycontrol_urls.set_many(urls)
+    return len(urls)
+
+
+if __name__ == '__main__':
+    for path in sys.argv[1:]:
+        print(f'Imported {import_moneycontrol_urls(path)} urls from {path}')
@@ -0,0 +1,251 @@
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+import threading
+import time
+import numpy as np
+import metrics
+
+CHUNK_SIZE = 10000
+FRONTIER_POINTS = 50
+GRID_SIZE = 100
+
+Portfolio = namedtuple('Portfolio',
+                       ['returns', 'volatility', 'sharpe', 'weights'])
+# sampled portfolios binned on a fixed volatility x returns grid, with the
+# highest return seen in every volatility bin as the frontier envelope
+FrontierGrid = namedtuple('FrontierGrid', ['counts', 'envelope',
+                                           'volatility_edges',
+                                           'returns_edges'])
+
+pools = {}
+pools_lock = threading.Lock()
+
+
+def annualised_performance(weights, mean_returns, cov_matrix, no_of_days):
+    # weights holds one portfolio per row
+    returns = weights.dot(mean_returns) * no_of_days
+    variance = (weights.dot(cov_matrix) * weights).sum(axis=1)
+    std = np.sqrt(variance) * np.sqrt(no_of_days)
+    return std, returns
+
+
+def random_weights(rng, num_portfolios, num_assets):
+    weights = rng.random((num_portfolios, num_assets))
+    weights /= weights.sum(axis=1, keepdims=True)
+    return weights
+
+
+def score_chunk(weights, mean_returns, cov_matrix, rfr, no_of_days):
+    volatility, returns = annualised_performance(
+        weights, mean_returns, cov_matrix, no_of_days)
+    sharpe = (returns - rfr) / volatility
+    i, j = np.argmin(volatility), np.argmax(sharpe)
+    return Portfolio(returns[i], volatility[i], sharpe[i],
+                     weights[i].copy()),\
+        Portfolio(returns[j], volatility[j], sharpe[j], weights[j].copy()),\
+        volatility, returns
+
+
+def get_grid_edges(mean_returns, cov_matrix, no_of_days):
+    # long only portfolios can not leave the range of the single assets,
+    # so the grid is fixed before anything is sampled
+    returns_min = mean_returns.min() * no_of_days
+    returns_max = max(mean_returns.max() * no_of_days, returns_min + 1e-9)
+    volatility_max = max(np.sqrt(np.diag(cov_matrix).max() * no_of_days),
+                         1e-9)
+    return np.linspace(0, volatility_max, GRID_SIZE + 1),\
+        np.linspace(returns_min, returns_max, GRID_SIZE + 1)
+
+
+def aggregate_chunk(volatility, returns, volatility_edges, returns_edges):
+    counts = np.histogram2d(volatility, returns,
+                            bins=[volatility_edges, returns_edges])[0]
+    bins = np.clip(np.searchsorted(volatility_edges, volatility) - 1,
+                   0, GRID_SIZE - 1)
+    envelope = np.full(GRID_SIZE, -np.inf)
+    np.maximum.at(envelope, bins, returns)
+    return counts, envelope
+
+
+def sample_chunk(mean_returns, cov_matrix, size, rfr, no_of_days,
+                 seed_sequence, volatility_edges, returns_edges):
+    rng = np.random.default_rng(seed_sequence)
+    min_vol, max_sharpe, volatility, returns = score_chunk(
+        random_weights(rng, size, len(mean_returns)),
+        mean_returns, cov_matrix, rfr, no_of_days)
+    return (min_vol, max_sharpe) + aggregate_chunk(
+        volatility, returns, volatility_edges, returns_edges)
+
+
+def get_pool(workers):
+    with pools_lock:
+        if workers not in pools:
+            pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pools[workers]
+
+
+def map_in_pool(fn, args_list, workers):
+    # yields results in submission order with a bounded number of chunks
+    # in flight, unstarted chunks are dropped when the caller stops early
+    pool = get_pool(workers)
+    args_list = iter(args_list)
+    pending = deque(pool.submit(fn, *args)
+                    for args in islice(args_list, workers * 2))
+    try:
+        while pending:
+            result = pending.popleft().result()
+            for args in islice(args_list, 1):
+                pending.append(pool.submit(fn, *args))
+            yield result
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def sample_portfolios(mean_returns, cov_matrix, num_portfolios: int,
+                      rfr=0.05, no_of_days=365, chunk_size=CHUNK_SIZE,
+                      on_chunk=None, seed=None, workers=None):
+    mean_returns = np.asarray(mean_returns, dtype='float64')
+    cov_matrix = np.asarray(cov_matrix, dtype='float64')
+    workers = workers or os.cpu_count() or 1
+    root = np.random.SeedSequence(seed)
+    chunks = [(start, min(chunk_size, num_portfolios - start))
+              for start in range(0, num_portfolios, chunk_size)]
+    # every chunk owns a seed stream, so the result for a given seed does
+    # not depend on how many workers drew the chunks
+    volatility_edges, returns_edges = get_grid_edges(
+        mean_returns, cov_matrix, no_of_days)
+    args_list = [(mean_returns, cov_matrix, size, rfr, no_of_days,
+                  np.random.SeedSequence(root.entropy, spawn_key=(index,)),
+                  volatility_edges, returns_edges)
+                 for index, (start, size) in enumerate(chunks)]
+    if workers == 1 or len(chunks) == 1:
+        results = (sample_chunk(*args) for args in args_list)
+    else:
+        results = map_in_pool(sample_chunk, args_list, workers)
+    min_vol, max_sharpe = None, None
+    counts = np.zeros((GRID_SIZE, GRID_SIZE))
+    envelope = np.full(GRID_SIZE, -np.inf)
+    evaluated, started = 0, time.perf_counter()
+    try:
+        for (start, size), (chunk_min_vol, chunk_max_sharpe,
+                            chunk_counts, chunk_envelope) in zip(
+                chunks, results):
+            evaluated = start + size
+            counts += chunk_counts
+            envelope = np.maximum(envelope, chunk_envelope)
+            if min_vol is None or \
+                    chunk_min_vol.volatility < min_vol.volatility:
+                min_vol = chunk_min_vol
+            if max_sharpe is None or \
+                    chunk_max_sharpe.sharpe > max_sharpe.sharpe:
+                max_sharpe = chunk_max_sharpe
+            # on_chunk returns True to keep the best so far and stop
+            if on_chunk is not None and \
+                    on_chunk(start + size, min_vol, max_sharpe):
+                break
+    finally:
+        results.close()
+        record_throughput(evaluated, time.perf_counter() - started)
+    return min_vol, max_sharpe, FrontierGrid(counts, envelope,
+                                             volatility_edges, returns_edges)
+
+
+def record_throughput(evaluated, elapsed):
+    metrics.optimizer_portfolios.inc(evaluated)
+    metrics.optimizer_seconds.inc(elapsed)
+    if elapsed > 0:
+        metrics.optimizer_throughput.set(evaluated / elapsed)
+
+
+def get_portfolio(weights, mean_returns, cov_matrix, rfr):
+    returns = weights.dot(mean_returns)
+    volatility = np.sqrt(weights.dot(cov_matrix).dot(weights))
+    return Portfolio(returns, volatility, (returns - rfr) / volatility,
+                     weights)
+
+
+def optimal_portfolios(mean_returns, cov_matrix, rfr=0.05, no_of_days=365,
+                       long_only=True, frontier_points=FRONTIER_POINTS):
+    mean_returns = np.asarray(mean_returns, dtype='float64') * no_of_days
+    cov_matrix = np.asarray(cov_matrix, dtype='float64') * no_of_days
+    if long_only:
+        solve = solve_long_only
+    else:
+        solve = solve_closed_form
+    min_vol, max_sharpe, frontier = solve(
+        mean_returns, cov_matrix, rfr, frontier_points)
+    return min_vol, max_sharpe, frontier
+
+
+def solve_closed_form(mean_returns, cov_matrix, rfr, frontier_points):
+    ones = np.ones(len(mean_returns))
+    inv_ones = np.linalg.solve(cov_matrix, ones)
+    inv_mean = np.linalg.solve(cov_matrix, mean_returns)
+    a, b, c = ones.dot(inv_ones), ones.dot(inv_mean), \
+        mean_returns.dot(inv_mean)
+    min_vol = get_portfolio(inv_ones / a, mean_returns, cov_matrix, rfr)
+    inv_excess = inv_mean - rfr * inv_ones
+    if ones.dot(inv_excess) <= 0:
+        raise ValueError('Risk free rate is above the minimum variance '
+                         'return, maximum Sharpe portfolio is unbounded '
+                         'when short selling is allowed')
+    max_sharpe = get_portfolio(inv_excess / ones.dot(inv_excess),
+                               mean_returns, cov_matrix, rfr)
+    d = a * c - b ** 2
+    frontier = [min_vol]
+    if d > 1e-12:
+        targets = np.linspace(min_vol.returns, mean_returns.max(),
+                              frontier_points)
+        frontier = [get_portfolio(
+            ((c - b * target) * inv_ones + (a * target - b) * inv_mean) / d,
+            mean_returns, cov_matrix, rfr) for target in targets]
+    return min_vol, max_sharpe, frontier
+
+
+def solve_long_only(mean_returns, cov_matrix, rfr, frontier_points):
+    num_assets = len(mean_returns)
+    if num_assets == 1:
+        # the whole budget goes to the only asset, nothing to solve
+        only = get_portfolio(np.ones(1), mean_returns, cov_matrix, rfr)
+        return only, only, [only]
+    # scipy is only needed once a long-only optimization runs
+    from scipy.optimize import minimize
+    initial = np.repeat(1 / num_assets, num_assets)
+    bounds = [(0, 1)] * num_assets
+    budget = {'type': 'eq', 'fun': lambda w: np.sum(w) - 1,
+              'jac': lambda w: np.ones(num_assets)}
+
+    def variance(w):
+        return w.dot(cov_matrix).dot(w)
+
+    def variance_jac(w):
+        return 2 * cov_matrix.dot(w)
+
+    def neg_sharpe_ratio(w):
+        volatility = np.sqrt(variance(w))
+        return -(w.dot(mean_returns) - rfr) / volatility
+
+    def solve(fun, jac, constraints):
+        result = minimize(fun, initial, jac=jac, method='SLSQP',
+                          bounds=bounds, constraints=constraints)
+        if not result.success:
+            raise ValueError('Long only optimization failed: ' +
+                             result.message)
+        # clip solver noise so weights stay a long-only allocation
+        weights = np.clip(result.x, 0, None)
+        return get_portfolio(weights / weights.sum(),
+                             mean_returns, cov_matrix, rfr)
+
+    min_vol = solve(variance, variance_jac, [budget])
+    max_sharpe = solve(neg_sharpe_ratio, None, [budget])
+    frontier = []
+    for target in np.linspace(min_vol.returns, mean_returns.max(),
+                              frontier_points):
+        on_target = {'type': 'eq',
+                     'fun': lambda w, t=target: w.dot(mean_returns) - t,
+                     'jac': lambda w: mean_returns}
+        frontier.append(solve(variance, variance_jac, [budget, on_target]))
+    return min_vol, max_sharpe, frontier
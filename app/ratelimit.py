@@ -0,0 +1,26 @@
+import threading
+import time
+
+
+class RateLimiter:
+
+    def __init__(self, rate: float, capacity: float = None):
+        # token bucket refilled at `rate` tokens per second
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.__tokens = self.capacity
+        self.__updated = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.__lock:
+                now = time.monotonic()
+                self.__tokens = min(self.capacity, self.__tokens +
+                                    (now - self.__updated) * self.rate)
+                self.__updated = now
+                if self.__tokens >= 1:
+                    self.__tokens -= 1
+                    return
+                wait = (1 - self.__tokens) / self.rate
+            time.sleep(wait)
@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'config.json')
+
+SCHEMA = {
+    'crypto': {
+        'crypto_compare_api_key': str,
+        'viewer': {
+            'pref_curr': list,
+            'markets': list,
+        },
+    },
+}
+OPTIONAL_SCHEMA = {
+    'crypto': {
+        'optimizer_workers': int,
+        'viewer': {
+            'carousel_tickers': int,
+        },
+    },
+    'stocks': {
+        'watchlist': list,
+        'screener_cache': dict,
+    },
+}
+CAROUSEL_TICKERS = 20
+SCREENER_CACHE_DEFAULTS = {
+    'max_entries': 64,
+    'tables_ttl': 24 * 60 * 60,
+    'key_stats_ttl': 60 * 60,
+    'peers_max_entries': 32,
+    'peers_ttl': 24 * 60 * 60,
+}
+
+
+def validate(data, schema, optional=False, path='config'):
+    if not isinstance(data, dict):
+        raise ValueError(f'{path} has to be an object')
+    for key, expected in schema.items():
+        if key not in data:
+            if optional:
+                continue
+            raise ValueError(f'{path}.{key} is missing')
+        if isinstance(expected, dict):
+            validate(data[key], expected, optional, f'{path}.{key}')
+        elif not isinstance(data[key], expected):
+            raise ValueError(
+                f'{path}.{key} has to be a {expected.__name__}')
+
+
+class Settings:
+
+    def __init__(self, path=CONFIG_PATH):
+        self.path = path
+        self.__data = None
+        self.__mtime = None
+        self.__lock = threading.Lock()
+
+    def get(self) -> dict:
+        # a stat per call, the file is only read again once it changes
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self.__mtime:
+            with self.__lock:
+                if mtime != self.__mtime:
+                    self.__load(mtime)
+        return self.__data
+
+    def __load(self, mtime):
+        try:
+            with open(self.path, 'r') as file:
+                data = json.load(file)
+            validate(data, SCHEMA)
+            validate(data, OPTIONAL_SCHEMA, optional=True)
+        except(ValueError) as e:
+            if self.__data is None:
+                raise
+            # keep serving the last good config while the file is edited
+            print(f'Ignoring invalid {self.path}:', e)
+            self.__mtime = mtime
+            return
+        self.__data, self.__mtime = data, mtime
+
+    def crypto_compare_api_key(self) -> str:
+        return self.get()['crypto']['crypto_compare_api_key']
+
+    def pref_currencies(self) -> list:
+        return self.get()['crypto']['viewer']['pref_curr']
+
+    def markets(self) -> list:
+        return self.get()['crypto']['viewer']['markets']
+
+    def carousel_tickers(self) -> int:
+        return self.get()['crypto']['viewer'].get('carousel_tickers',
+                                                  CAROUSEL_TICKERS)
+
+    def optimizer_workers(self) -> int:
+        # no value uses every core
+        return self.get()['crypto'].get('optimizer_workers')
+
+    def watchlist(self) -> list:
+        return self.get().get('stocks', {}).get('watchlist', [])
+
+    def screener_cache(self) -> dict:
+        return dict(SCREENER_CACHE_DEFAULTS, **self.get().get(
+            'stocks', {}).get('screener_cache', {}))
+
+
+settings = Settings()
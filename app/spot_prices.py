@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import Future
+from cache import TTLCache
+from http_client import http
+
+PRICE_MULTI_URL = 'https://min-api.cryptocompare.com/data/pricemulti'
+SPOT_PRICE_TTL = 5
+# CryptoCompare caps the comma separated fsyms parameter
+MAX_FSYMS_LENGTH = 300
+
+
+class SpotPrices:
+
+    def __init__(self, ttl=SPOT_PRICE_TTL, to_symbol='USD'):
+        self.to_symbol = to_symbol
+        self.__prices = TTLCache(maxsize=4096, ttl=ttl, name='spot_prices')
+        self.__in_flight = {}
+        self.__lock = threading.Lock()
+
+    def get(self, symbols, api_key) -> dict:
+        # symbols without a price are left out of the result
+        prices, waiting, missing = {}, {}, []
+        future = Future()
+        with self.__lock:
+            for symbol in dict.fromkeys(symbols):
+                price = self.__prices.get(symbol)
+                if price is not None:
+                    prices[symbol] = price
+                elif symbol in self.__in_flight:
+                    # another request is already fetching this symbol
+                    waiting[symbol] = self.__in_flight[symbol]
+                else:
+                    missing.append(symbol)
+                    self.__in_flight[symbol] = future
+        if missing:
+            try:
+                fetched = self.__fetch(missing, api_key)
+                for symbol, price in fetched.items():
+                    self.__prices.set(symbol, price)
+                future.set_result(fetched)
+            except Exception as e:
+                future.set_exception(e)
+                raise
+            finally:
+                with self.__lock:
+                    for symbol in missing:
+                        self.__in_flight.pop(symbol, None)
+            prices.update(fetched)
+        for symbol, pending in waiting.items():
+            fetched = pending.result()
+            if symbol in fetched:
+                prices[symbol] = fetched[symbol]
+        return prices
+
+    def __fetch(self, symbols, api_key) -> dict:
+        prices = {}
+        for batch in get_batches(symbols):
+            data = http.get(PRICE_MULTI_URL, params={
+                "fsyms": ','.join(batch),
+                "tsyms": self.to_symbol,
+                "api_key": api_key
+            }).json()
+            if data.get('Response') == 'Error':
+                raise ValueError(data.get('Message'))
+            prices.update({symbol: value[self.to_symbol]
+                           for symbol, value in data.items()
+                           if self.to_symbol in value})
+        return prices
+
+
+def get_batches(symbols):
+    batch, length = [], 0
+    for symbol in symbols:
+        if batch and length + len(symbol) + 1 > MAX_FSYMS_LENGTH:
+            yield batch
+            batch, length = [], 0
+        batch.append(symbol)
+        length += len(symbol) + 1
+    if batch:
+        yield batch
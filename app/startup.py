@@ -0,0 +1,49 @@
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+import metrics
+
+
+class StartupTimer:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.__preloaded = set()
+        self.__lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name, seconds):
+        self.phases[name] = seconds
+        metrics.startup_seconds.set(seconds, phase=name)
+
+    def report(self) -> str:
+        self.record('total', time.perf_counter() - self.started)
+        return 'Startup took ' + ', '.join(
+            f'{name} {seconds:.2f}s' for name, seconds in self.phases.items())
+
+    def preload(self, *names):
+        # modules deferred out of startup are imported in the background
+        # once their page is opened, before its callbacks need them
+        with self.__lock:
+            names = [name for name in names if name not in self.__preloaded]
+            self.__preloaded.update(names)
+        if names:
+            threading.Thread(target=self.__import, args=(names,),
+                             daemon=True).start()
+
+    def __import(self, names):
+        for name in names:
+            with self.phase(name):
+                try:
+                    importlib.import_module(name)
+                except ImportError as e:
+                    print("Preload failed:", name, e)